@@ -2,16 +2,21 @@ from ._array import Array as Array
 from ._array import ArrayEvent as ArrayEvent
 from ._array import TypedArray as TypedArray
 from ._awareness import Awareness as Awareness
+from ._awareness import AwarenessRegistry as AwarenessRegistry
+from ._awareness import AwarenessScheduler as AwarenessScheduler
 from ._awareness import is_awareness_disconnect_message as is_awareness_disconnect_message
 from ._doc import Doc as Doc
 from ._doc import TypedDoc as TypedDoc
 from ._map import Map as Map
 from ._map import MapEvent as MapEvent
 from ._map import TypedMap as TypedMap
+from ._metrics import TransactionMetrics as TransactionMetrics
 from ._pycrdt import StackItem as StackItem
 from ._pycrdt import SubdocsEvent as SubdocsEvent
 from ._pycrdt import Subscription as Subscription
 from ._pycrdt import TransactionEvent as TransactionEvent
+from ._sticky_index import Assoc as Assoc
+from ._sticky_index import StickyIndex as StickyIndex
 from ._sync import Decoder as Decoder
 from ._sync import Encoder as Encoder
 from ._sync import YMessageType as YMessageType
@@ -29,6 +34,10 @@ from ._transaction import NewTransaction as NewTransaction
 from ._transaction import ReadTransaction as ReadTransaction
 from ._transaction import Transaction as Transaction
 from ._undo import UndoManager as UndoManager
+from ._undo import UndoManagerGroup as UndoManagerGroup
+from ._update import aget_state as aget_state
+from ._update import aget_update as aget_update
+from ._update import amerge_updates as amerge_updates
 from ._update import get_state as get_state
 from ._update import get_update as get_update
 from ._update import merge_updates as merge_updates
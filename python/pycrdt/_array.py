@@ -6,6 +6,7 @@ from ._base import BaseDoc, BaseEvent, BaseType, Typed, base_types, event_types
 from ._pycrdt import Array as _Array
 from ._pycrdt import ArrayEvent as _ArrayEvent
 from ._pycrdt import Subscription
+from ._sticky_index import Assoc, StickyIndex
 
 if TYPE_CHECKING:
     from ._doc import Doc
@@ -138,6 +139,23 @@ class Array(BaseType, Generic[T]):
             del self[index]
             return res
 
+    def sticky_index(self, index: int, assoc: Assoc = Assoc.AFTER) -> StickyIndex:
+        """
+        Creates a position that keeps pointing to the same place when items are
+        inserted or removed before it (see [StickyIndex][pycrdt.StickyIndex]).
+
+        Args:
+            index: The index in the array.
+            assoc: The side of the index the position sticks to.
+
+        Raises:
+            IndexError: Index out of bounds.
+
+        Returns:
+            The sticky index.
+        """
+        return StickyIndex.new(self, index, assoc)
+
     def move(self, source_index: int, destination_index: int) -> None:
         """
         Moves an item in the array from a source index to a destination index.
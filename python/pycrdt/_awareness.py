@@ -1,35 +1,94 @@
 from __future__ import annotations
 
-import copy
 import json
+from heapq import heapify, heappop, heappush
+from itertools import count
+from math import inf
 from time import time
-from typing import Any, Callable, Literal, cast
-from uuid import uuid4
+from typing import Any, Callable, Iterator, Literal, cast
 
-from anyio import TASK_STATUS_IGNORED, create_task_group, sleep
+from anyio import TASK_STATUS_IGNORED, Event, create_task_group, move_on_after
 from anyio.abc import TaskGroup, TaskStatus
 
 from ._doc import Doc
-from ._sync import Decoder, Encoder, read_message
+from ._pycrdt import decode_awareness_update, encode_awareness_update
+from ._sync import read_message
+
+_subscription_ids = count()
 
 
 class Awareness:
+    __slots__ = (
+        "client_id",
+        "_outdated_timeout",
+        "_meta",
+        "_states",
+        "_serialized",
+        "_expiry",
+        "_expiring",
+        "_deadline",
+        "_scheduler",
+        "_shared_scheduler",
+        "_update_interval",
+        "_pending",
+        "_last_flush",
+        "_subscriptions",
+        "_task_group",
+    )
+
     client_id: int
+    _outdated_timeout: int
     _meta: dict[int, dict[str, Any]]
     _states: dict[int, dict[str, Any]]
+    _serialized: dict[int, str]
+    _expiry: list[tuple[int, int]]
+    _expiring: set[int]
+    _deadline: float | None
+    _scheduler: AwarenessScheduler
+    _shared_scheduler: bool
+    _update_interval: int | None
+    _pending: list[tuple[Any, dict[int, str]]]
+    _last_flush: float
     _subscriptions: dict[str, Callable[[str, tuple[dict[str, Any], Any]], None]]
     _task_group: TaskGroup | None
 
-    def __init__(self, ydoc: Doc, *, outdated_timeout: int = 30000) -> None:
+    def __init__(
+        self,
+        ydoc: Doc,
+        *,
+        outdated_timeout: int = 30000,
+        scheduler: AwarenessScheduler | None = None,
+        update_interval: int | None = None,
+    ) -> None:
         """
         Args:
             ydoc: The [Doc][pycrdt.Doc] to associate the awareness with.
             outdated_timeout: The timeout (in milliseconds) to consider a client gone.
+            scheduler: The [AwarenessScheduler][pycrdt.AwarenessScheduler] to share with
+                other awareness instances, if any. If not provided, the awareness has its
+                own scheduler, that runs with [start()][pycrdt.Awareness.start].
+            update_interval: The minimum interval (in milliseconds) between `"update"`
+                events, if any. Changes happening within the interval are collapsed, and
+                emitted as one `"update"` event per origin when the interval has elapsed
+                (or when calling [flush()][pycrdt.Awareness.flush]), so that all the
+                changed clients can be encoded in one message. `"change"` events are
+                not delayed.
         """
         self.client_id = ydoc.client_id
         self._outdated_timeout = outdated_timeout
         self._meta = {}
         self._states = {}
+        self._serialized = {}
+        # remote clients ordered by (lastUpdated, client_id), with at most one entry per client:
+        # a client that was updated since its entry was pushed is pushed again when it pops
+        self._expiry = []
+        self._expiring = set()
+        self._deadline = None
+        self._shared_scheduler = scheduler is not None
+        self._scheduler = AwarenessScheduler() if scheduler is None else scheduler
+        self._update_interval = update_interval
+        self._pending = []
+        self._last_flush = -inf
         self._subscriptions = {}
         self._task_group = None
         self.set_local_state({})
@@ -41,7 +100,11 @@ class Awareness:
 
     @property
     def states(self) -> dict[int, dict[str, Any]]:
-        """The client states."""
+        """
+        The client states.
+        They must not be mutated in place: their serialization is cached until they are
+        set again (see [set_local_state()][pycrdt.Awareness.set_local_state]).
+        """
         return self._states
 
     def _emit(
@@ -52,44 +115,140 @@ class Awareness:
         removed: list[int],
         origin: Any,
     ):
+        if topic == "update" and self._update_interval is not None:
+            self._throttle(added, updated, removed, origin)
+            return
         for callback in self._subscriptions.values():
             callback(topic, ({"added": added, "updated": updated, "removed": removed}, origin))
 
+    def _throttle(
+        self,
+        added: list[int],
+        updated: list[int],
+        removed: list[int],
+        origin: Any,
+    ) -> None:
+        for _origin, changes in self._pending:
+            if _origin is origin or _origin == origin:
+                break
+        else:
+            changes = {}
+            self._pending.append((origin, changes))
+        for client_id in added:
+            changes[client_id] = "updated" if changes.get(client_id) == "removed" else "added"
+        for client_id in updated:
+            if changes.get(client_id) != "added":
+                changes[client_id] = "updated"
+        for client_id in removed:
+            changes[client_id] = "removed"
+        assert self._update_interval is not None
+        if self._last_flush + self._update_interval <= self._get_time():
+            self.flush()
+        else:
+            self._schedule()
+
+    def flush(self) -> None:
+        """
+        Emits the pending `"update"` events, if any (see `update_interval`).
+        """
+        self._last_flush = self._get_time()
+        pending = self._pending
+        self._pending = []
+        for origin, changes in pending:
+            added = []
+            updated = []
+            removed = []
+            for client_id, change in changes.items():
+                if change == "added":
+                    added.append(client_id)
+                elif change == "updated":
+                    updated.append(client_id)
+                else:
+                    removed.append(client_id)
+            for callback in self._subscriptions.values():
+                callback(
+                    "update", ({"added": added, "updated": updated, "removed": removed}, origin)
+                )
+
     def _get_time(self) -> int:
         return int(time() * 1000)
 
     async def start(self, *, task_status: TaskStatus[None] = TASK_STATUS_IGNORED) -> None:
         """
         Starts updating the awareness periodically.
+
+        Raises:
+            RuntimeError: The awareness is already started, or uses a shared scheduler.
         """
+        if self._shared_scheduler:
+            raise RuntimeError("Awareness uses a shared scheduler")
         if self._task_group is not None:
             raise RuntimeError("Awareness already started")
 
+        self._track_clients()
         async with create_task_group() as tg:
             self._task_group = tg
             task_status.started()
-            tg.start_soon(self._start)
+            tg.start_soon(self._scheduler._run)
 
-    async def _start(self) -> None:
-        while True:
-            await sleep(self._outdated_timeout / 1000 / 10)
-            now = self._get_time()
+    def _track_clients(self) -> None:
+        # remote states that were not applied with apply_awareness_update() expire too
+        for client_id, meta in self._meta.items():
             if (
-                self.get_local_state() is not None
-                and self._outdated_timeout / 2 <= now - self._meta[self.client_id]["lastUpdated"]
+                client_id != self.client_id
+                and client_id in self._states
+                and client_id not in self._expiring
             ):
-                # renew local clock
-                self.set_local_state(self.get_local_state())
-            remove: list[int] = []
-            for client_id, meta in self._meta.items():
-                if (
-                    client_id != self.client_id
-                    and self._outdated_timeout <= now - meta["lastUpdated"]
-                    and client_id in self._states
-                ):
-                    remove.append(client_id)
-            if remove:
-                self.remove_awareness_states(remove, "timeout")
+                self._expire(meta["lastUpdated"], client_id)
+        self._schedule()
+
+    def _expire(self, last_updated: int, client_id: int) -> None:
+        heappush(self._expiry, (last_updated, client_id))
+        self._expiring.add(client_id)
+
+    def _tick(self, now: int) -> None:
+        local_meta = self._meta[self.client_id]
+        if (
+            self.get_local_state() is not None
+            and self._outdated_timeout / 2 <= now - local_meta["lastUpdated"]
+        ):
+            # renew local clock
+            state = self.get_local_state()
+            self._set_local_state(state, state, False)
+        remove: list[int] = []
+        expiry = self._expiry
+        while expiry and self._outdated_timeout <= now - expiry[0][0]:
+            _, client_id = heappop(expiry)
+            self._expiring.discard(client_id)
+            meta = self._meta.get(client_id)
+            if meta is None or client_id not in self._states:
+                continue
+            if self._outdated_timeout <= now - meta["lastUpdated"]:
+                remove.append(client_id)
+            else:
+                self._expire(meta["lastUpdated"], client_id)
+        if remove:
+            self.remove_awareness_states(remove, "timeout")
+        if (
+            self._pending
+            and self._update_interval is not None
+            and self._last_flush + self._update_interval <= now
+        ):
+            self.flush()
+        self._deadline = None
+        self._schedule()
+
+    def _schedule(self) -> None:
+        # schedule the next tick, if it is earlier than the scheduled one
+        deadline = inf
+        if self.get_local_state() is not None:
+            deadline = self._meta[self.client_id]["lastUpdated"] + self._outdated_timeout / 2
+        if self._expiry:
+            deadline = min(deadline, self._expiry[0][0] + self._outdated_timeout)
+        if self._pending and self._update_interval is not None:
+            deadline = min(deadline, self._last_flush + self._update_interval)
+        if deadline != inf and (self._deadline is None or deadline < self._deadline):
+            self._scheduler._schedule(self, deadline)
 
     async def stop(self) -> None:
         """
@@ -110,23 +269,32 @@ class Awareness:
     def set_local_state(self, state: dict[str, Any] | None) -> None:
         """
         Updates the local state and meta, and sends the changes to subscribers.
+        The state is not copied: a state that is mutated in place and set again is
+        considered changed.
 
         Args:
             state: The new local state, if any.
         """
+        prev_state = self._states.get(self.client_id)
+        changed = state is prev_state or state != prev_state
+        self._set_local_state(state, prev_state, changed)
+
+    def _set_local_state(
+        self, state: dict[str, Any] | None, prev_state: dict[str, Any] | None, changed: bool
+    ) -> None:
         client_id = self.client_id
         curr_local_meta = self._meta.get(client_id)
         clock = 0 if curr_local_meta is None else curr_local_meta["clock"] + 1
-        prev_state = self._states.get(client_id)
-        if prev_state is not None:
-            prev_state = copy.deepcopy(prev_state)
         if state is None:
             if client_id in self._states:
                 del self._states[client_id]
         else:
             self._states[client_id] = state
+        if changed or state is None:
+            self._serialized.pop(client_id, None)
         timestamp = self._get_time()
         self._meta[client_id] = {"clock": clock, "lastUpdated": timestamp}
+        self._schedule()
         added = []
         updated = []
         filtered_updated = []
@@ -134,11 +302,10 @@ class Awareness:
         if state is None:
             removed.append(client_id)
         elif prev_state is None:
-            if state is not None:
-                added.append(client_id)
+            added.append(client_id)
         else:
             updated.append(client_id)
-            if prev_state != state:
+            if changed:
                 filtered_updated.append(client_id)
         if added or filtered_updated or removed:
             self._emit("change", added, filtered_updated, removed, "local")
@@ -147,16 +314,18 @@ class Awareness:
     def set_local_state_field(self, field: str, value: Any) -> None:
         """
         Sets a local state field.
+        The local state is shallow-copied, and only the field is compared to detect a change.
 
         Args:
             field: The field of the local state to set.
             value: The value associated with the field.
         """
-        state = self.get_local_state()
-        if state is not None:
-            state = copy.deepcopy(state)
+        prev_state = self.get_local_state()
+        if prev_state is not None:
+            changed = field not in prev_state or prev_state[field] != value
+            state = dict(prev_state)
             state[field] = value
-            self.set_local_state(state)
+            self._set_local_state(state, prev_state, changed)
 
     def remove_awareness_states(self, client_ids: list[int], origin: Any) -> None:
         """
@@ -170,6 +339,7 @@ class Awareness:
         for client_id in client_ids:
             if client_id in self._states:
                 del self._states[client_id]
+                self._serialized.pop(client_id, None)
                 if client_id == self.client_id:
                     cur_meta = self._meta[client_id]
                     self._meta[client_id] = {
@@ -191,15 +361,22 @@ class Awareness:
         Returns:
             The encoded awareness update.
         """
-        encoder = Encoder()
-        encoder.write_var_uint(len(client_ids))
+        clients = []
         for client_id in client_ids:
-            state = self._states.get(client_id)
             clock = cast(int, self._meta.get(client_id, {}).get("clock"))
-            encoder.write_var_uint(client_id)
-            encoder.write_var_uint(clock)
-            encoder.write_var_string(json.dumps(state, separators=(",", ":")))
-        return encoder.to_bytes()
+            clients.append((client_id, clock, self._serialize(client_id)))
+        return encode_awareness_update(clients)
+
+    def _serialize(self, client_id: int) -> str:
+        # the serialized state is cached until the state is set or removed,
+        # unknown and removed clients are not cached
+        state_str = self._serialized.get(client_id)
+        if state_str is None:
+            state = self._states.get(client_id)
+            state_str = json.dumps(state, separators=(",", ":"))
+            if state is not None:
+                self._serialized[client_id] = state_str
+        return state_str
 
     def apply_awareness_update(self, update: bytes, origin: Any) -> None:
         """
@@ -209,18 +386,17 @@ class Awareness:
             update: The binary update.
             origin: The origin of the update.
         """
-        decoder = Decoder(update)
         timestamp = self._get_time()
         added = []
         updated = []
         filtered_updated = []
         removed = []
-        length = decoder.read_var_uint()
-        for _ in range(length):
-            client_id = decoder.read_var_uint()
-            clock = decoder.read_var_uint()
-            state_str = decoder.read_var_string()
-            state = None if not state_str else json.loads(state_str)
+        for client_id, clock, state_str in decode_awareness_update(update):
+            if state_str and state_str == self._serialized.get(client_id):
+                # same state as the one we have, no need to deserialize it
+                state = self._states.get(client_id)
+            else:
+                state = None if not state_str else json.loads(state_str)
             client_meta = self._meta.get(client_id)
             prev_state = self._states.get(client_id)
             curr_clock = 0 if client_meta is None else client_meta["clock"]
@@ -237,8 +413,12 @@ class Awareness:
                     else:
                         if client_id in self._states:
                             del self._states[client_id]
+                        self._serialized.pop(client_id, None)
                 else:
                     self._states[client_id] = state
+                    self._serialized[client_id] = state_str
+                    if client_id != self.client_id and client_id not in self._expiring:
+                        self._expire(timestamp, client_id)
                 self._meta[client_id] = {
                     "clock": clock,
                     "lastUpdated": timestamp,
@@ -248,9 +428,10 @@ class Awareness:
                 elif client_meta is not None and state is None:
                     removed.append(client_id)
                 elif state is not None:
-                    if state != prev_state:
+                    if state is not prev_state and state != prev_state:
                         filtered_updated.append(client_id)
                     updated.append(client_id)
+        self._schedule()
         if added or filtered_updated or removed:
             self._emit("change", added, filtered_updated, removed, origin)
         if added or updated or removed:
@@ -266,7 +447,7 @@ class Awareness:
         Returns:
             The subscription ID that can be used to unobserve.
         """
-        id = str(uuid4())
+        id = str(next(_subscription_ids))
         self._subscriptions[id] = callback
         return id
 
@@ -280,6 +461,205 @@ class Awareness:
         del self._subscriptions[id]
 
 
+class AwarenessScheduler:
+    """
+    Updates [Awareness][pycrdt.Awareness] instances periodically, from a single task.
+    Instead of scanning all clients at regular intervals, an awareness is only woken up
+    when one of its remote clients times out, or when its local state must be renewed.
+
+    ```py
+    scheduler = AwarenessScheduler()
+    awareness1 = Awareness(doc1, scheduler=scheduler)
+    awareness2 = Awareness(doc2, scheduler=scheduler)
+
+    async with create_task_group() as tg:
+        await tg.start(scheduler.start)
+    ```
+    """
+
+    _heap: list[tuple[float, int, Awareness]]
+    _stale: int
+    _task_group: TaskGroup | None
+    _wakeup: Event | None
+
+    def __init__(self) -> None:
+        self._heap = []
+        # number of heap entries that were superseded by an earlier deadline or unscheduled,
+        # they are skipped when popped and dropped when they make up half of the heap
+        self._stale = 0
+        self._counter = count()
+        self._task_group = None
+        self._wakeup = None
+        self._sleep_until = inf
+
+    def _schedule(self, awareness: Awareness, deadline: float) -> None:
+        if awareness._deadline is not None:
+            self._stale += 1
+        awareness._deadline = deadline
+        heappush(self._heap, (deadline, next(self._counter), awareness))
+        self._compact()
+        if self._wakeup is not None and deadline < self._sleep_until:
+            self._wakeup.set()
+
+    def _unschedule(self, awareness: Awareness) -> None:
+        if awareness._deadline is not None:
+            awareness._deadline = None
+            self._stale += 1
+            self._compact()
+
+    def _compact(self) -> None:
+        heap = self._heap
+        if self._stale > 64 and 2 * self._stale > len(heap):
+            heap[:] = [entry for entry in heap if entry[2]._deadline == entry[0]]
+            heapify(heap)
+            self._stale = 0
+
+    async def start(self, *, task_status: TaskStatus[None] = TASK_STATUS_IGNORED) -> None:
+        """
+        Starts updating the awareness instances periodically.
+        """
+        if self._task_group is not None:
+            raise RuntimeError("Awareness scheduler already started")
+
+        async with create_task_group() as tg:
+            self._task_group = tg
+            task_status.started()
+            tg.start_soon(self._run)
+
+    async def _run(self) -> None:
+        heap = self._heap
+        while True:
+            now = int(time() * 1000)
+            while heap and heap[0][0] <= now:
+                deadline, _, awareness = heappop(heap)
+                # an awareness may have been scheduled again earlier, or unscheduled
+                if awareness._deadline == deadline:
+                    awareness._tick(now)
+                else:
+                    self._stale -= 1
+            self._wakeup = Event()
+            self._sleep_until = heap[0][0] if heap else inf
+            with move_on_after((self._sleep_until - now) / 1000):
+                await self._wakeup.wait()
+
+    async def stop(self) -> None:
+        """
+        Stops updating the awareness instances periodically.
+        """
+        if self._task_group is None:
+            raise RuntimeError("Awareness scheduler not started")
+        self._task_group.cancel_scope.cancel()
+        self._task_group = None
+        self._wakeup = None
+
+
+class AwarenessRegistry:
+    """
+    A registry of the [Awareness][pycrdt.Awareness] of many rooms, all updated
+    periodically by a single [AwarenessScheduler][pycrdt.AwarenessScheduler].
+    Each room has its own states, so that encoding the update of a room does not
+    touch the other rooms.
+
+    ```py
+    registry = AwarenessRegistry()
+    awareness = registry.add("room", doc)
+
+    async with create_task_group() as tg:
+        await tg.start(registry.start)
+    ```
+    """
+
+    _rooms: dict[str, Awareness]
+    _scheduler: AwarenessScheduler
+
+    def __init__(
+        self, *, outdated_timeout: int = 30000, update_interval: int | None = None
+    ) -> None:
+        """
+        Args:
+            outdated_timeout: The timeout (in milliseconds) to consider a client gone,
+                in all rooms.
+            update_interval: The minimum interval (in milliseconds) between `"update"`
+                events, in all rooms (see [Awareness][pycrdt.Awareness]).
+        """
+        self._outdated_timeout = outdated_timeout
+        self._update_interval = update_interval
+        self._rooms = {}
+        self._scheduler = AwarenessScheduler()
+
+    def add(self, room: str, ydoc: Doc) -> Awareness:
+        """
+        Creates the awareness of a room.
+
+        Args:
+            room: The name of the room.
+            ydoc: The [Doc][pycrdt.Doc] of the room.
+
+        Returns:
+            The awareness of the room.
+
+        Raises:
+            KeyError: The room already exists.
+        """
+        if room in self._rooms:
+            raise KeyError(f"Room already exists: {room}")
+        awareness = Awareness(
+            ydoc,
+            outdated_timeout=self._outdated_timeout,
+            scheduler=self._scheduler,
+            update_interval=self._update_interval,
+        )
+        self._rooms[room] = awareness
+        return awareness
+
+    def remove(self, room: str) -> None:
+        """
+        Removes the awareness of a room, which should not be used anymore.
+
+        Args:
+            room: The name of the room.
+        """
+        awareness = self._rooms.pop(room)
+        self._scheduler._unschedule(awareness)
+
+    def encode_awareness_update(self, room: str, client_ids: list[int]) -> bytes:
+        """
+        Creates an encoded awareness update of the clients of a room, given by their IDs.
+
+        Args:
+            room: The name of the room.
+            client_ids: The list of client IDs for which to create an update.
+
+        Returns:
+            The encoded awareness update.
+        """
+        return self._rooms[room].encode_awareness_update(client_ids)
+
+    def __getitem__(self, room: str) -> Awareness:
+        return self._rooms[room]
+
+    def __contains__(self, room: str) -> bool:
+        return room in self._rooms
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rooms)
+
+    def __len__(self) -> int:
+        return len(self._rooms)
+
+    async def start(self, *, task_status: TaskStatus[None] = TASK_STATUS_IGNORED) -> None:
+        """
+        Starts updating the awareness of all rooms periodically.
+        """
+        await self._scheduler.start(task_status=task_status)
+
+    async def stop(self) -> None:
+        """
+        Stops updating the awareness of all rooms periodically.
+        """
+        await self._scheduler.stop()
+
+
 def is_awareness_disconnect_message(message: bytes) -> bool:
     """
     Check if the message is null, which means that it is a disconnection message
@@ -291,14 +671,11 @@ def is_awareness_disconnect_message(message: bytes) -> bool:
     Returns:
         Whether the message is a disconnection message or not.
     """
-    decoder = Decoder(read_message(message))
-    length = decoder.read_var_uint()
+    clients = decode_awareness_update(read_message(message))
     # A disconnection message should be a single message
-    if length == 1:
-        # Remove client_id and clock information from message (not used)
-        for _ in range(2):
-            decoder.read_var_uint()
-        state = decoder.read_var_string()
+    if len(clients) == 1:
+        # client_id and clock information are not used
+        state = clients[0][2]
         if state == "null":
             return True
     return False
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import threading
 from abc import ABC, abstractmethod
 from functools import lru_cache, partial
 from inspect import signature
@@ -15,15 +14,17 @@ from typing import (
     get_type_hints,
     overload,
 )
+from weakref import WeakMethod
 
 import anyio
 from anyio import BrokenResourceError, create_memory_object_stream
 from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 
+from ._metrics import TransactionMetrics
 from ._pycrdt import Doc as _Doc
 from ._pycrdt import Subscription
 from ._pycrdt import Transaction as _Transaction
-from ._transaction import ReadTransaction, Transaction
+from ._transaction import ReadTransaction, Transaction, TransactionLock
 
 if TYPE_CHECKING:
     from ._doc import Doc
@@ -42,17 +43,23 @@ class BaseDoc:
     _doc: _Doc
     _twin_doc: BaseDoc | None
     _txn: Transaction | None
-    _txn_lock: threading.Lock
+    _txn_lock: TransactionLock
     _txn_async_lock: anyio.Lock
     _allow_multithreading: bool
     _Model: Any
     _subscriptions: list[Subscription]
     _origins: dict[int, Any]
+    _instrumentation: Callable[[TransactionMetrics], None] | None
+    _txn_metrics: TransactionMetrics | None
+    _after_transaction: list[WeakMethod]
+    _root_trackers: list[WeakMethod]
+    _origin_trackers: list[WeakMethod]
 
     def __init__(
         self,
         *,
         client_id: int | None = None,
+        offset_kind: Literal["bytes", "utf16"] = "bytes",
         doc: _Doc | None = None,
         Model=None,
         allow_multithreading: bool = False,
@@ -60,15 +67,20 @@ class BaseDoc:
     ) -> None:
         super().__init__(**data)
         if doc is None:
-            doc = _Doc(client_id)
+            doc = _Doc(client_id, offset_kind)
         self._doc = doc
         self._txn = None
-        self._txn_lock = threading.Lock()
+        self._txn_lock = TransactionLock()
         self._txn_async_lock = anyio.Lock()
         self._Model = Model
         self._subscriptions = []
         self._origins = {}
         self._allow_multithreading = allow_multithreading
+        self._instrumentation = None
+        self._txn_metrics = None
+        self._after_transaction = []
+        self._root_trackers = []
+        self._origin_trackers = []
 
 
 class BaseType(ABC):
@@ -276,7 +288,10 @@ def observe_callback(
     _event = event_types[type(event)](event, doc)
     with doc._read_transaction(event.transaction) as txn:
         params = (_event, txn)
-        callback(*params[:param_nb])  # type: ignore[arg-type]
+        if doc._txn_metrics is None:
+            callback(*params[:param_nb])  # type: ignore[arg-type]
+        else:
+            doc._txn_metrics.call_observer(callback, *params[:param_nb])
 
 
 def observe_deep_callback(
@@ -289,7 +304,10 @@ def observe_deep_callback(
         events[idx] = event_types[type(event)](event, doc)
     with doc._read_transaction(event.transaction) as txn:
         params = (events, txn)
-        callback(*params[:param_nb])  # type: ignore[arg-type]
+        if doc._txn_metrics is None:
+            callback(*params[:param_nb])  # type: ignore[arg-type]
+        else:
+            doc._txn_metrics.call_observer(callback, *params[:param_nb])
 
 
 class BaseEvent:
@@ -3,10 +3,11 @@ from __future__ import annotations
 from functools import partial
 from typing import Any, Callable, Generic, Iterable, Literal, Type, TypeVar, Union, cast, overload
 
-from anyio import BrokenResourceError, create_memory_object_stream
+from anyio import BrokenResourceError, CapacityLimiter, create_memory_object_stream, to_thread
 from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 
 from ._base import BaseDoc, BaseType, Typed, base_types, forbid_read_transaction
+from ._metrics import TransactionMetrics
 from ._pycrdt import Doc as _Doc
 from ._pycrdt import SubdocsEvent, Subscription, TransactionEvent
 from ._pycrdt import Transaction as _Transaction
@@ -30,6 +31,7 @@ class Doc(BaseDoc, Generic[T]):
         init: dict[str, T] = {},
         *,
         client_id: int | None = None,
+        offset_kind: Literal["bytes", "utf16"] = "bytes",
         doc: _Doc | None = None,
         Model=None,
         allow_multithreading: bool = False,
@@ -38,19 +40,26 @@ class Doc(BaseDoc, Generic[T]):
         Args:
             init: The initial root types of the document.
             client_id: An optional client ID for the document.
+            offset_kind: The unit of text indices and lengths: `"bytes"` (UTF-8 bytes)
+                or `"utf16"` (UTF-16 code units, like JavaScript clients).
             allow_multithreading: Whether to allow the document to be used in different threads.
         """
         super().__init__(
-            client_id=client_id, doc=doc, Model=Model, allow_multithreading=allow_multithreading
+            client_id=client_id,
+            offset_kind=offset_kind,
+            doc=doc,
+            Model=Model,
+            allow_multithreading=allow_multithreading,
         )
         for k, v in init.items():
             self[k] = v
         if Model is not None:
-            self._twin_doc = Doc(init)
+            self._twin_doc = Doc(init, offset_kind=offset_kind)
         self._send_streams: dict[
             bool, set[MemoryObjectSendStream[TransactionEvent | SubdocsEvent]]
         ] = {False: set(), True: set()}
         self._event_subscription: dict[bool, Subscription] = {}
+        self._instrumentation_subscription: Subscription | None = None
 
     @property
     def guid(self) -> int:
@@ -62,6 +71,11 @@ class Doc(BaseDoc, Generic[T]):
         """The document client ID."""
         return self._doc.client_id()
 
+    @property
+    def offset_kind(self) -> Literal["bytes", "utf16"]:
+        """The unit of text indices and lengths in the document."""
+        return cast(Literal["bytes", "utf16"], self._doc.offset_kind())
+
     def transaction(self, origin: Any = None) -> Transaction:
         """
         Creates a new transaction or gets the current one, if any.
@@ -140,7 +154,7 @@ class Doc(BaseDoc, Generic[T]):
         Returns:
             The current document state.
         """
-        return self._doc.get_state()
+        return self._read_shared(self._doc.get_state)
 
     def get_update(self, state: bytes | None = None) -> bytes:
         """
@@ -152,7 +166,47 @@ class Doc(BaseDoc, Generic[T]):
         """
         if state is None:
             state = b"\x00"
-        return self._doc.get_update(state)
+        return self._read_shared(self._doc.get_update, state)
+
+    def _read_shared(self, read: Callable[..., bytes], *args: Any) -> bytes:
+        # The native reads release the GIL. In a multithreaded document, they hold the
+        # transaction lock shared, so that transactions in other threads wait for them
+        # instead of failing, and several threads can read at the same time.
+        if not self._allow_multithreading:
+            return read(*args)
+        self._txn_lock.acquire(shared=True)
+        try:
+            return read(*args)
+        finally:
+            self._txn_lock.release(shared=True)
+
+    async def aget_update(
+        self, state: bytes | None = None, *, limiter: CapacityLimiter | None = None
+    ) -> bytes:
+        """
+        Same as [get_update()][pycrdt.Doc.get_update], but encodes the update in a worker
+        thread, without blocking the event loop.
+        In the meantime, transactions from other tasks must be opened with
+        [new_transaction()][pycrdt.Doc.new_transaction], which waits for the update to be
+        encoded.
+
+        Args:
+            state: The optional document state from which to get the update.
+            limiter: An optional capacity limiter for the worker threads.
+
+        Returns:
+            The update from the given document state (if any), or from the document creation.
+        """
+        if state is None:
+            state = b"\x00"
+        if self._allow_multithreading:
+            await self._txn_lock.acquire_async(shared=True)
+            try:
+                return await to_thread.run_sync(self._doc.get_update, state, limiter=limiter)
+            finally:
+                self._txn_lock.release(shared=True)
+        async with self._txn_async_lock:
+            return await to_thread.run_sync(self._doc.get_update, state, limiter=limiter)
 
     def apply_update(self, update: bytes) -> None:
         """
@@ -172,6 +226,8 @@ class Doc(BaseDoc, Generic[T]):
             forbid_read_transaction(txn)
             assert txn._txn is not None
             self._doc.apply_update(txn._txn, update)
+            if self._root_trackers:
+                self._track_roots(txn)
 
     def __setitem__(self, key: str, value: T) -> None:
         """
@@ -192,9 +248,19 @@ class Doc(BaseDoc, Generic[T]):
         with self.transaction() as txn:
             forbid_read_transaction(txn)
             integrated = value._get_or_insert(key, self)
+            if self._root_trackers:
+                self._track_roots(txn)
             prelim = value._integrate(self, integrated)
             value._init(prelim)
 
+    def _track_roots(self, txn: Transaction) -> None:
+        for ref in list(self._root_trackers):
+            callback = ref()
+            if callback is None:
+                self._root_trackers.remove(ref)
+            else:
+                callback(txn)
+
     def __getitem__(self, key: str) -> T:
         """
         Gets the document root type corresponding to the given key:
@@ -277,10 +343,52 @@ class Doc(BaseDoc, Generic[T]):
         Returns:
             The subscription that can be used to [unobserve()][pycrdt.Doc.unobserve].
         """
-        subscription = self._doc.observe(callback)
+        if self._instrumentation is None:
+            subscription = self._doc.observe(callback)
+        else:
+            subscription = self._doc.observe(partial(self._observe_callback, callback))
         self._subscriptions.append(subscription)
         return subscription
 
+    def _observe_callback(
+        self, callback: Callable[[TransactionEvent], None], event: TransactionEvent
+    ) -> None:
+        if self._txn_metrics is None:
+            callback(event)
+        else:
+            self._txn_metrics.call_observer(callback, event)
+
+    def instrument(self, callback: Callable[[TransactionMetrics], None] | None) -> None:
+        """
+        Sets a callback to be called with the metrics of each transaction, after it is committed.
+        Instrumentation has a small overhead and is disabled by default.
+        The durations of document observers are only measured for the callbacks passed to
+        [observe()][pycrdt.Doc.observe] while instrumentation is enabled.
+
+        ```py
+        def on_transaction(metrics: TransactionMetrics):
+            histogram.observe(metrics.duration)
+
+        doc.instrument(on_transaction)
+        ```
+
+        Args:
+            callback: The callback to call with the
+                [TransactionMetrics][pycrdt.TransactionMetrics], or `None` to disable
+                instrumentation.
+        """
+        if callback is None:
+            if self._instrumentation_subscription is not None:
+                self._instrumentation_subscription.drop()
+                self._instrumentation_subscription = None
+        elif self._instrumentation_subscription is None:
+            self._instrumentation_subscription = self._doc.observe(self._record_update)
+        self._instrumentation = callback
+
+    def _record_update(self, event: TransactionEvent) -> None:
+        if self._txn_metrics is not None:
+            self._txn_metrics.record_update(event.update, event.before_state, event.after_state)
+
     def observe_subdocs(self, callback: Callable[[SubdocsEvent], None]) -> Subscription:
         """
         Subscribes a callback to be called with the document subdoc change event.
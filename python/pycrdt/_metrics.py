@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from time import perf_counter
+from typing import Any, Callable
+
+from ._sync import Decoder
+
+
+class TransactionMetrics:
+    """
+    Metrics collected for a transaction of an instrumented document
+    (see [Doc.instrument()][pycrdt.Doc.instrument]).
+
+    Attributes:
+        origin (Any): The origin of the transaction.
+        duration (float): The time (in seconds) the transaction was held, including its commit.
+        lock_wait (float): The time (in seconds) spent waiting to acquire the transaction.
+        nesting (int): The maximum number of nested transactions.
+        commit_duration (float): The time (in seconds) spent committing the transaction,
+            including calling the observers.
+        observer_durations (dict[Callable, float]): The time (in seconds) spent in each observer
+            callback.
+        update_size (int): The size (in bytes) of the update produced by the transaction.
+        integrated (int): The number of clock ticks (units of content) integrated in the document.
+    """
+
+    __slots__ = (
+        "origin",
+        "duration",
+        "lock_wait",
+        "nesting",
+        "commit_duration",
+        "observer_durations",
+        "update_size",
+        "integrated",
+        "_start",
+    )
+
+    def __init__(self, lock_wait: float = 0) -> None:
+        self.origin: Any = None
+        self.duration = 0.0
+        self.lock_wait = lock_wait
+        self.nesting = 1
+        self.commit_duration = 0.0
+        self.observer_durations: dict[Callable, float] = {}
+        self.update_size = 0
+        self.integrated = 0
+        self._start = perf_counter()
+
+    def call_observer(self, callback: Callable, *args: Any) -> None:
+        start = perf_counter()
+        try:
+            callback(*args)
+        finally:
+            duration = perf_counter() - start
+            self.observer_durations[callback] = (
+                self.observer_durations.get(callback, 0.0) + duration
+            )
+
+    def record_update(self, update: bytes, before_state: bytes, after_state: bytes) -> None:
+        self.update_size += len(update)
+        before = decode_state(before_state)
+        after = decode_state(after_state)
+        self.integrated += sum(clock - before.get(client, 0) for client, clock in after.items())
+
+    def __str__(self) -> str:
+        slots = [slot for slot in self.__slots__ if not slot.startswith("_")]
+        return "{" + ", ".join(f"{slot}: {getattr(self, slot)}" for slot in slots) + "}"
+
+
+def decode_state(state: bytes) -> dict[int, int]:
+    decoder = Decoder(state)
+    length = decoder.read_var_uint()
+    clocks = {}
+    for _ in range(length):
+        client = decoder.read_var_uint()
+        clocks[client] = decoder.read_var_uint()
+    return clocks
@@ -3,13 +3,17 @@ from typing import Any, Callable, Iterator
 class Doc:
     """Shared document."""
 
-    def __init__(self, client_id: int | None) -> None:
+    def __init__(self, client_id: int | None, offset_kind: str | None = None) -> None:
         """Create a new document with an optional global client ID.
-        If no client ID is passed, a random one will be generated."""
+        If no client ID is passed, a random one will be generated.
+        Text indices are in `offset_kind` units ("bytes" by default, or "utf16")."""
 
     def client_id(self) -> int:
         """Returns the document unique client identifier."""
 
+    def offset_kind(self) -> str:
+        """Returns the unit of text indices ("bytes" or "utf16")."""
+
     def guid(self) -> int:
         """Returns the document globally unique identifier."""
 
@@ -51,6 +55,23 @@ class Doc:
         """Subscribes a callback to be called with the shared document subdoc change event.
         Returns a subscription that can be used to unsubscribe."""
 
+class StickyIndex:
+    """A position in a sequence that is preserved across concurrent edits."""
+
+    @staticmethod
+    def decode(data: bytes) -> StickyIndex:
+        """Decodes a sticky index."""
+
+    def encode(self) -> bytes:
+        """Encodes the sticky index."""
+
+    def get_offset(self, txn: Transaction) -> int | None:
+        """Returns the current index, or `None` if it cannot be resolved."""
+
+    @property
+    def assoc(self) -> int:
+        """`-1` if associated with the item before the index, `0` for the item after."""
+
 class Subscription:
     """Observer subscription."""
 
@@ -80,11 +101,33 @@ class TransactionEvent:
     def update(self) -> bytes:
         """The emitted binary update."""
 
+    @property
+    def before_state(self) -> bytes:
+        """The document state before the transaction."""
+
+    @property
+    def after_state(self) -> bytes:
+        """The document state after the transaction."""
+
+    @property
+    def changed(self) -> dict[str, set[str | int]]:
+        """The names of the changed root types, mapped to their changed top-level keys or
+        indices: the keys set or removed and the indices at which content was inserted or
+        removed in the root type itself, and the keys or indices of its changed nested shared
+        types. It is computed when first read in the callback, or when the callback returns if
+        it kept the event, since the transaction is freed once committed."""
+
 class SubdocsEvent:
     """
     Event generated by the [observe_subdocs][pycrdt.Doc.observe_subdocs] method,
     emitted during the transaction commit phase."""
 
+class DiffIterator:
+    """Iterator converting the formatted chunks of a text to Python one at a time."""
+
+    def __iter__(self) -> DiffIterator: ...
+    def __next__(self) -> tuple[Any, dict[str, Any] | None]: ...
+
 class TextEvent:
     """Event generated by `Text.observe` method. Emitted during transaction commit
     phase."""
@@ -137,8 +180,27 @@ class Text:
     def get_string(self, txn: Transaction) -> str:
         """Returns a text representation of the current shared text."""
 
-    def diff(self, txn: Transaction) -> list[tuple[Any, dict[str, Any] | None]]:
-        """Returns a sequence of formatted chunks."""
+    def set_from(self, txn: Transaction, value: str) -> None:
+        """Replaces the content with the given string, applying only the changes."""
+
+    def sticky_index(self, txn: Transaction, index: int, assoc: int) -> StickyIndex | None:
+        """Creates a sticky index, or returns `None` if the index is out of bounds."""
+
+    def apply_delta(self, txn: Transaction, delta: list[dict[str, Any]]) -> None:
+        """Applies a delta of insert, retain and delete operations."""
+
+    def convert_indexes(
+        self, txn: Transaction, indexes: list[int], source: str, target: str
+    ) -> list[int]:
+        """Converts indices from `source` to `target` units ("bytes", "utf16" or "codepoints")."""
+
+    def diff(
+        self, txn: Transaction, start: int = 0, stop: int | None = None
+    ) -> list[tuple[Any, dict[str, Any] | None]]:
+        """Returns the formatted chunks in the given range."""
+
+    def iter_diff(self, txn: Transaction, start: int = 0, stop: int | None = None) -> DiffIterator:
+        """Returns an iterator converting the formatted chunks in the given range one at a time."""
 
     def observe(self, callback: Callable[[TextEvent], None]) -> Subscription:
         """Subscribes a callback to be called with the shared text change event.
@@ -157,6 +219,9 @@ class Array:
     def insert(self, txn: Transaction, index: int, value: Any) -> None:
         """Inserts `value` at the given `index`."""
 
+    def sticky_index(self, txn: Transaction, index: int, assoc: int) -> StickyIndex | None:
+        """Creates a sticky index, or returns `None` if the index is out of bounds."""
+
     def move_to(self, txn: Transaction, source: int, target: int) -> None:
         """Moves element found at `source` index into `target` index position.."""
 
@@ -217,6 +282,9 @@ class XmlFragment:
     def parent(self) -> XmlFragment | XmlElement | XmlText | None:
         """Returns the parent of the XML fragment, if any."""
 
+    def to_dict(self, txn: Transaction) -> dict[str, Any]:
+        """Exports the node and its descendants to dicts and lists."""
+
     def get_string(self, txn: Transaction) -> str:
         """Returns a text representation of the current shared XML."""
 
@@ -226,6 +294,12 @@ class XmlFragment:
     def get(self, txn: Transaction, index: int) -> XmlFragment | XmlElement | XmlText | None:
         """Gets a child item by index, or `None` if the index is out of bounds."""
 
+    def children(self, txn: Transaction) -> list[XmlElement | XmlText]:
+        """Returns the children."""
+
+    def walk(self, txn: Transaction) -> list[XmlElement | XmlText]:
+        """Returns all the descendants, depth-first and in document order."""
+
     def remove_range(self, txn: Transaction, index: int, len: int) -> None:
         """Removes a range of children."""
 
@@ -235,6 +309,11 @@ class XmlFragment:
     def insert_element_prelim(self, txn: Transaction, index: int, tag: str) -> XmlElement:
         """Inserts an empty element node at given index, and returns it."""
 
+    def insert_tree(
+        self, txn: Transaction, index: int, nodes: list[dict[str, Any]]
+    ) -> list[XmlElement | XmlText]:
+        """Inserts nodes and their descendants given as dicts, and returns the inserted nodes."""
+
     def observe(self, callback: Callable[[XmlEvent], None]) -> Subscription:
         """Subscribes a callback to be called with the XML change event.
         Returns a subscription that can be used to unsubscribe."""
@@ -248,6 +327,9 @@ class XmlElement:
     def parent(self) -> XmlFragment | XmlElement | XmlText | None:
         """Returns the parent of the XML element, if any."""
 
+    def to_dict(self, txn: Transaction) -> dict[str, Any]:
+        """Exports the node and its descendants to dicts and lists."""
+
     def get_string(self, txn: Transaction) -> str:
         """Returns a text representation of the current shared XML."""
 
@@ -257,6 +339,12 @@ class XmlElement:
     def get(self, txn: Transaction, index: int) -> XmlFragment | XmlElement | XmlText | None:
         """Gets a child item by index, or `None` if the index is out of bounds."""
 
+    def children(self, txn: Transaction) -> list[XmlElement | XmlText]:
+        """Returns the children."""
+
+    def walk(self, txn: Transaction) -> list[XmlElement | XmlText]:
+        """Returns all the descendants, depth-first and in document order."""
+
     def remove_range(self, txn: Transaction, index: int, len: int) -> None:
         """Removes a range of children."""
 
@@ -266,15 +354,41 @@ class XmlElement:
     def insert_element_prelim(self, txn: Transaction, index: int, tag: str) -> XmlElement:
         """Inserts an empty element node at a given index, and returns it."""
 
-    def attributes(self, txn: Transaction) -> list[tuple[str, str]]:
+    def insert_tree(
+        self, txn: Transaction, index: int, nodes: list[dict[str, Any]]
+    ) -> list[XmlElement | XmlText]:
+        """Inserts nodes and their descendants given as dicts, and returns the inserted nodes."""
+
+    def attributes(self, txn: Transaction) -> list[tuple[str, Any]]:
         """Gets all attributes, as a list of `(key, value)` tuples."""
 
-    def attribute(self, txn: Transaction, name: str) -> str | None:
+    def attribute(self, txn: Transaction, name: str) -> Any | None:
         """Gets an attribute, or `None` if the attribute does not exist."""
 
-    def insert_attribute(self, txn: Transaction, name: str, value: str) -> None:
+    def attributes_len(self, txn: Transaction) -> int:
+        """Returns the number of attributes."""
+
+    def attribute_keys(self, txn: Transaction) -> list[str]:
+        """Returns the names of the attributes."""
+
+    def has_attribute(self, txn: Transaction, name: str) -> bool:
+        """Returns `True` if the attribute exists."""
+
+    def get_attributes(self, txn: Transaction, names: list[str]) -> list[Any | None]:
+        """Gets several attributes, with `None` for the attributes that do not exist."""
+
+    def insert_attribute(self, txn: Transaction, name: str, value: Any) -> None:
         """Inserts or overwrites an attribute."""
 
+    def insert_attribute_text_prelim(self, txn: Transaction, name: str) -> Text:
+        """Inserts an empty text as an attribute, and returns it."""
+
+    def insert_attribute_array_prelim(self, txn: Transaction, name: str) -> Array:
+        """Inserts an empty array as an attribute, and returns it."""
+
+    def insert_attribute_map_prelim(self, txn: Transaction, name: str) -> Map:
+        """Inserts an empty map as an attribute, and returns it."""
+
     def remove_attribute(self, txn: Transaction, name: str) -> None:
         """Removes an attribute."""
 
@@ -294,18 +408,42 @@ class XmlText:
     def parent(self) -> XmlFragment | XmlElement | XmlText | None:
         """Returns the XML text parent, if any."""
 
+    def to_dict(self, txn: Transaction) -> dict[str, Any]:
+        """Exports the node and its descendants to dicts and lists."""
+
     def get_string(self, txn: Transaction) -> str:
         """Returns a text representation of the current shared XML."""
 
-    def attributes(self, txn: Transaction) -> list[tuple[str, str]]:
+    def attributes(self, txn: Transaction) -> list[tuple[str, Any]]:
         """Gets all attributes, as a list of `(key, value)` tuples."""
 
-    def attribute(self, txn: Transaction, name: str) -> str | None:
+    def attribute(self, txn: Transaction, name: str) -> Any | None:
         """Gets an attribute, or `None` if the attribute does not exist."""
 
-    def insert_attribute(self, txn: Transaction, name: str, value: str) -> None:
+    def attributes_len(self, txn: Transaction) -> int:
+        """Returns the number of attributes."""
+
+    def attribute_keys(self, txn: Transaction) -> list[str]:
+        """Returns the names of the attributes."""
+
+    def has_attribute(self, txn: Transaction, name: str) -> bool:
+        """Returns `True` if the attribute exists."""
+
+    def get_attributes(self, txn: Transaction, names: list[str]) -> list[Any | None]:
+        """Gets several attributes, with `None` for the attributes that do not exist."""
+
+    def insert_attribute(self, txn: Transaction, name: str, value: Any) -> None:
         """Inserts or overwrites an attribute."""
 
+    def insert_attribute_text_prelim(self, txn: Transaction, name: str) -> Text:
+        """Inserts an empty text as an attribute, and returns it."""
+
+    def insert_attribute_array_prelim(self, txn: Transaction, name: str) -> Array:
+        """Inserts an empty array as an attribute, and returns it."""
+
+    def insert_attribute_map_prelim(self, txn: Transaction, name: str) -> Map:
+        """Inserts an empty map as an attribute, and returns it."""
+
     def remove_attribute(self, txn: Transaction, name: str) -> None:
         """Removes an attribute."""
 
@@ -327,8 +465,19 @@ class XmlText:
     def format(self, txn: Transaction, index: int, len: int, attrs: Iterator[tuple[str, Any]]):
         """Adds attributes to a section of text."""
 
-    def diff(self, txn: Transaction) -> list[tuple[Any, dict[str, Any] | None]]:
-        """Returns a sequence of formatted chunks."""
+    def sticky_index(self, txn: Transaction, index: int, assoc: int) -> StickyIndex | None:
+        """Creates a sticky index, or returns `None` if the index is out of bounds."""
+
+    def apply_delta(self, txn: Transaction, delta: list[dict[str, Any]]) -> None:
+        """Applies a delta of insert, retain and delete operations."""
+
+    def diff(
+        self, txn: Transaction, start: int = 0, stop: int | None = None
+    ) -> list[tuple[Any, dict[str, Any] | None]]:
+        """Returns the formatted chunks in the given range."""
+
+    def iter_diff(self, txn: Transaction, start: int = 0, stop: int | None = None) -> DiffIterator:
+        """Returns an iterator converting the formatted chunks in the given range one at a time."""
 
     def observe(self, callback: Callable[[XmlEvent], None]) -> Subscription:
         """Subscribes a callback to be called with the XML change event.
@@ -342,12 +491,32 @@ class XmlText:
 class UndoManager:
     """Undo manager."""
 
-    def __init__(self, doc: Doc, capture_timeout_millis, timestamp: Callable[[], int]) -> None:
+    def __init__(
+        self, doc: Doc, capture_timeout_millis, timestamp: Callable[[], int] | None = None
+    ) -> None:
         """Creates an undo manager."""
 
-    def expand_scope(self, scope: Text | Array | Map) -> None:
+    def expand_scope_text(self, scope: Text) -> None:
         """Extends a list of shared types tracked by current undo manager by a given scope."""
 
+    def expand_scope_array(self, scope: Array) -> None:
+        """Extends a list of shared types tracked by current undo manager by a given scope."""
+
+    def expand_scope_map(self, scope: Map) -> None:
+        """Extends a list of shared types tracked by current undo manager by a given scope."""
+
+    def expand_scope_xmlfragment(self, scope: XmlFragment) -> None:
+        """Extends a list of shared types tracked by current undo manager by a given scope."""
+
+    def expand_scope_xmlelement(self, scope: XmlElement) -> None:
+        """Extends a list of shared types tracked by current undo manager by a given scope."""
+
+    def expand_scope_xmltext(self, scope: XmlText) -> None:
+        """Extends a list of shared types tracked by current undo manager by a given scope."""
+
+    def expand_scope_roots(self, txn: Transaction) -> None:
+        """Extends a list of shared types tracked by current undo manager by all the root types."""
+
     def include_origin(self, origin: int) -> None:
         """Extends a list of origins tracked by current undo manager by a given origin."""
 
@@ -375,11 +544,40 @@ class UndoManager:
     def redo_stack(self) -> list[StackItem]:
         """Returns the undo manager's redo stack."""
 
+    def undo_stack_len(self) -> int:
+        """Returns the number of items in the undo stack."""
+
+    def redo_stack_len(self) -> int:
+        """Returns the number of items in the redo stack."""
+
+    def undo_item_size(self, index: int) -> int | None:
+        """Returns the size (in bytes) of the encoded undo stack item at the given index."""
+
+    def memory_usage(self) -> tuple[int, int]:
+        """Returns the size (in bytes) of the encoded undo and redo stacks."""
+
+    def set_capturing(self, capturing: bool) -> None:
+        """Sets whether new changes are captured."""
+
 class StackItem:
     """A unit of work for the [UndoManager][pycrdt.UndoManager], consisting of
     compressed information about all updates and deletions tracked by it.
     """
 
+    @property
+    def insertions(self) -> bytes:
+        """The IDs of the inserted items, encoded as a delete set (v1 encoding)."""
+
+    @property
+    def deletions(self) -> bytes:
+        """The IDs of the deleted items, encoded as a delete set (v1 encoding)."""
+
+    @property
+    def size(self) -> int:
+        """The size (in bytes) of the encoded insertions and deletions."""
+
 def merge_updates(updates: tuple[bytes, ...]) -> bytes: ...
 def get_state(update: bytes) -> bytes: ...
 def get_update(update: bytes, state: bytes) -> bytes: ...
+def encode_awareness_update(clients: list[tuple[int, int, str]]) -> bytes: ...
+def decode_awareness_update(update: bytes) -> list[tuple[int, int, str]]: ...
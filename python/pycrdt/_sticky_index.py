@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+from enum import IntEnum
+from typing import TYPE_CHECKING, Union
+
+from ._pycrdt import StickyIndex as _StickyIndex
+
+if TYPE_CHECKING:
+    from ._array import Array
+    from ._text import Text
+    from ._transaction import Transaction
+    from ._xml import XmlText
+
+    Sequence = Union[Array, Text, XmlText]
+
+
+class Assoc(IntEnum):
+    """
+    The side a [StickyIndex][pycrdt.StickyIndex] sticks to.
+    """
+
+    AFTER = 0
+    """Stick to the item after the index (e.g. the character on the right of a cursor)."""
+
+    BEFORE = -1
+    """Stick to the item before the index (e.g. the character on the left of a cursor)."""
+
+
+class StickyIndex:
+    """
+    A position in a [Text][pycrdt.Text], an [Array][pycrdt.Array] or an
+    [XmlText][pycrdt.XmlText] that keeps pointing to the same place when content is
+    inserted or removed before it, including by concurrent remote edits:
+    ```py
+    doc = Doc()
+    doc["text"] = text = Text("Hello, World!")
+    cursor = text.sticky_index(7)
+    text.insert(0, "Oh, ")
+    assert cursor.get_index() == 11
+    ```
+    """
+
+    _sticky_index: _StickyIndex
+    _sequence: Sequence
+
+    def __init__(self, sticky_index: _StickyIndex, sequence: Sequence) -> None:
+        self._sticky_index = sticky_index
+        self._sequence = sequence
+
+    @classmethod
+    def new(cls, sequence: Sequence, index: int, assoc: Assoc = Assoc.AFTER) -> StickyIndex:
+        """
+        Creates a sticky index.
+
+        Args:
+            sequence: The sequence the index refers to.
+            index: The index in the sequence.
+            assoc: The side of the index the sticky index sticks to.
+
+        Raises:
+            IndexError: Index out of bounds.
+
+        Returns:
+            The sticky index.
+        """
+        with sequence.doc.transaction() as txn:
+            sequence._forbid_read_transaction(txn)
+            sticky_index = sequence.integrated.sticky_index(txn._txn, index, assoc)
+        if sticky_index is None:
+            raise IndexError(index)
+        return cls(sticky_index, sequence)
+
+    @property
+    def assoc(self) -> Assoc:
+        """
+        The side of the index the sticky index sticks to.
+        """
+        return Assoc(self._sticky_index.assoc)
+
+    @property
+    def sequence(self) -> Sequence:
+        """
+        The sequence the index refers to.
+        """
+        return self._sequence
+
+    def get_index(self, transaction: Transaction | None = None) -> int | None:
+        """
+        Args:
+            transaction: The transaction to use, if any.
+
+        Returns:
+            The current index in the sequence, or `None` if the position cannot be resolved
+                in this document (e.g. its content has not been received yet).
+        """
+        if transaction is None:
+            transaction = self._sequence.doc.transaction()
+        with transaction as txn:
+            assert txn._txn is not None
+            return self._sticky_index.get_offset(txn._txn)
+
+    def encode(self) -> bytes:
+        """
+        Returns:
+            The sticky index, in a compact binary form.
+        """
+        return self._sticky_index.encode()
+
+    @classmethod
+    def decode(cls, data: bytes, sequence: Sequence) -> StickyIndex:
+        """
+        Decodes a sticky index.
+
+        It is not checked that the index was created for `sequence`:
+        [get_index()][pycrdt.StickyIndex.get_index] always resolves the position in the
+        sequence the index was created for, and `sequence` is only used for its document.
+
+        Args:
+            data: The encoded sticky index (see [encode()][pycrdt.StickyIndex.encode]).
+            sequence: The sequence the index refers to, which must be the one it was created for.
+
+        Raises:
+            ValueError: The data cannot be decoded.
+
+        Returns:
+            The sticky index.
+        """
+        return cls(_StickyIndex.decode(data), sequence)
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from enum import IntEnum
-from typing import Iterator
+from typing import TYPE_CHECKING, Iterator
 
-from ._doc import Doc
+if TYPE_CHECKING:
+    from ._doc import Doc
 
 
 class YMessageType(IntEnum):
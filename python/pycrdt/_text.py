@@ -1,15 +1,18 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any, Callable, Iterator, cast
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Literal, cast
 
 from ._base import BaseEvent, BaseType, base_types, event_types
 from ._pycrdt import Subscription
 from ._pycrdt import Text as _Text
 from ._pycrdt import TextEvent as _TextEvent
+from ._sticky_index import Assoc, StickyIndex
 
 if TYPE_CHECKING:
     from ._doc import Doc
 
+OffsetKind = Literal["bytes", "utf16", "codepoints"]
+
 
 class Text(BaseType):
     """
@@ -286,16 +289,153 @@ class Text(BaseType):
             if length > 0:
                 self.integrated.format(txn._txn, start, length, iter(attrs.items()))
 
-    def diff(self) -> list[tuple[Any, dict[str, Any] | None]]:
+    def set_from(self, value: str) -> None:
+        """
+        Replaces the content of the text with the given string, by applying only the
+        changes between them. Unlike replacing the whole text, this keeps the update small
+        and the positions of other users in the unchanged parts:
+        ```py
+        Doc()["text"] = text = Text("Hello, World!")
+        text.set_from("Hello, Bob!")
+        assert str(text) == "Hello, Bob!"
+        ```
+
+        Args:
+            value: The new content of the text.
+
+        Raises:
+            ValueError: The text has embeds.
+        """
+        with self.doc.transaction() as txn:
+            self._forbid_read_transaction(txn)
+            self.integrated.set_from(txn._txn, value)
+
+    def sticky_index(self, index: int, assoc: Assoc = Assoc.AFTER) -> StickyIndex:
+        """
+        Creates a position that keeps pointing to the same place when text is
+        inserted or removed before it (see [StickyIndex][pycrdt.StickyIndex]).
+
+        Args:
+            index: The index in the text.
+            assoc: The side of the index the position sticks to.
+
+        Raises:
+            IndexError: Index out of bounds.
+
+        Returns:
+            The sticky index.
+        """
+        return StickyIndex.new(self, index, assoc)
+
+    def apply_delta(self, delta: Iterable[dict[str, Any]]) -> None:
+        """
+        Applies a delta in a single native call, for instance coming from a rich-text editor:
+        ```py
+        text.apply_delta([{"retain": 6}, {"insert": "World", "attributes": {"bold": True}}])
+        ```
+
+        Args:
+            delta: The operations, in the format of [TextEvent.delta][pycrdt.TextEvent]:
+                `{"insert": str | Any, "attributes": dict}`, `{"retain": int, "attributes": dict}`
+                or `{"delete": int}`.
+                Inserts without attributes are not formatted.
+
+        Raises:
+            ValueError: An operation is invalid, or goes past the end of the text.
+        """
+        with self.doc.transaction() as txn:
+            self._forbid_read_transaction(txn)
+            self.integrated.apply_delta(txn._txn, list(delta))
+
+    def convert_index(self, index: int, source: OffsetKind, target: OffsetKind) -> int:
+        """
+        Converts an index between units, for instance from a Python string index
+        (`"codepoints"`) to the unit of the document
+        (see [Doc.offset_kind][pycrdt.Doc.offset_kind]):
+        ```py
+        doc = Doc(offset_kind="utf16")
+        doc["text"] = text = Text("🐍 Python")
+        assert text.convert_index(2, "codepoints", "utf16") == 3
+        ```
+
+        Args:
+            index: The index to convert.
+            source: The unit of the index: `"bytes"`, `"utf16"` or `"codepoints"`.
+            target: The unit to convert to.
+
+        Raises:
+            IndexError: Index out of bounds.
+
+        Returns:
+            The converted index. An index in the middle of a character is rounded down.
+        """
+        return self.convert_indexes([index], source, target)[0]
+
+    def convert_indexes(
+        self, indexes: Iterable[int], source: OffsetKind, target: OffsetKind
+    ) -> list[int]:
+        """
+        Converts many indices between units in a single pass over the text, which stops at the
+        largest index, see [convert_index()][pycrdt.Text.convert_index].
+
+        Args:
+            indexes: The indices to convert, in any order.
+            source: The unit of the indices: `"bytes"`, `"utf16"` or `"codepoints"`.
+            target: The unit to convert to.
+
+        Raises:
+            IndexError: An index is out of bounds.
+
+        Returns:
+            The converted indices, in the same order.
+        """
+        with self.doc.transaction() as txn:
+            return self.integrated.convert_indexes(txn._txn, list(indexes), source, target)
+
+    def diff(
+        self, start: int = 0, stop: int | None = None
+    ) -> list[tuple[Any, dict[str, Any] | None]]:
         """
+        Args:
+            start: The index at which the chunks start (included).
+            stop: The index at which the chunks stop (excluded), or `None` for the end of the text.
+                The first and last chunks are cut at the range boundaries.
+
         Returns:
             A list of formatted chunks that the current text corresponds to.
                 Each list item is a tuple containing the chunk's content and formatting attributes.
                 The content is usually the text as a string, but may be other data for embedded
                 objects.
+
+        Raises:
+            ValueError: `stop` is smaller than `start`, or a range boundary falls inside a
+                character.
+        """
+        with self.doc.transaction() as txn:
+            return self.integrated.diff(txn._txn, start, stop)
+
+    def iter_diff(
+        self, start: int = 0, stop: int | None = None
+    ) -> Iterator[tuple[Any, dict[str, Any] | None]]:
+        """
+        A variant of [diff()][pycrdt.Text.diff] that converts the chunks to Python objects one at
+        a time while iterating, for instance to render only what fits in a view.
+        The formatted chunks of the whole text are still computed up front, and their embeds
+        converted, so this only saves the conversion of the strings that are not iterated over.
+
+        Args:
+            start: The index at which the chunks start (included).
+            stop: The index at which the chunks stop (excluded), or `None` for the end of the text.
+
+        Returns:
+            An iterator over the formatted chunks, as of the time of the call.
+
+        Raises:
+            ValueError: `stop` is smaller than `start`, or a range boundary falls inside a
+                character.
         """
         with self.doc.transaction() as txn:
-            return self.integrated.diff(txn._txn)
+            return self.integrated.iter_diff(txn._txn, start, stop)
 
     def observe(self, callback: Callable[[TextEvent], None]) -> Subscription:
         """
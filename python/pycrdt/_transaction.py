@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from collections import deque
 from functools import partial
+from time import perf_counter
 from types import TracebackType
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, Callable
 
-from anyio import to_thread
+from anyio import Event, move_on_after
 
+from ._metrics import TransactionMetrics
 from ._pycrdt import Transaction as _Transaction
 
 if TYPE_CHECKING:
@@ -27,6 +32,7 @@ class Transaction:
     _leases: int
     _origin_hash: int | None
     _timeout: float
+    _lock_wait: float
 
     def __init__(
         self,
@@ -45,20 +51,39 @@ class Transaction:
             self._origin_hash = hash_origin(origin)
             doc._origins[self._origin_hash] = origin
         self._timeout = -1 if timeout is None else timeout
+        self._lock_wait = 0
 
     def __enter__(self, _acquire_transaction: bool = True) -> Transaction:
         self._leases += 1
         if self._txn is None:
-            if (
-                self._doc._allow_multithreading
-                and _acquire_transaction
-                and not self._doc._txn_lock.acquire(timeout=self._timeout)
-            ):
-                raise TimeoutError("Could not acquire transaction")
+            instrumented = self._doc._instrumentation is not None
+            if self._doc._allow_multithreading and _acquire_transaction:
+                start = perf_counter()
+                if not self._doc._txn_lock.acquire(timeout=self._timeout):
+                    raise TimeoutError("Could not acquire transaction")
+                if instrumented:
+                    self._lock_wait = perf_counter() - start
             if self._origin_hash is not None:
+                if self._doc._origin_trackers:
+                    # must be done before the transaction is created
+                    origin = self._doc._origins[self._origin_hash]
+                    for ref in list(self._doc._origin_trackers):
+                        callback = ref()
+                        if callback is None:
+                            self._doc._origin_trackers.remove(ref)
+                        else:
+                            callback(origin)
                 self._txn = self._doc._doc.create_transaction_with_origin(self._origin_hash)
             else:
                 self._txn = self._doc._doc.create_transaction()
+            if instrumented:
+                metrics = TransactionMetrics(lock_wait=self._lock_wait)
+                if self._origin_hash is not None:
+                    metrics.origin = self._doc._origins[self._origin_hash]
+                self._doc._txn_metrics = metrics
+        elif self._doc._txn_metrics is not None and not isinstance(self, ReadTransaction):
+            metrics = self._doc._txn_metrics
+            metrics.nesting = max(metrics.nesting, self._leases)
         self._doc._txn = self
         return self
 
@@ -73,8 +98,15 @@ class Transaction:
         # since nested transactions reuse the root transaction
         if self._leases == 0:
             assert self._txn is not None
+            metrics = None
             if not isinstance(self, ReadTransaction):
-                self._txn.commit()
+                metrics = self._doc._txn_metrics
+                if metrics is not None:
+                    start = perf_counter()
+                    self._txn.commit()
+                    metrics.commit_duration = perf_counter() - start
+                else:
+                    self._txn.commit()
                 origin_hash = self._txn.origin()
                 if origin_hash is not None:
                     del self._doc._origins[origin_hash]
@@ -83,6 +115,18 @@ class Transaction:
             self._txn.drop()
             self._txn = None
             self._doc._txn = None
+            if metrics is not None:
+                self._doc._txn_metrics = None
+                metrics.duration = perf_counter() - metrics._start
+                assert self._doc._instrumentation is not None
+                self._doc._instrumentation(metrics)
+            if self._doc._after_transaction and not isinstance(self, ReadTransaction):
+                for ref in list(self._doc._after_transaction):
+                    callback = ref()
+                    if callback is None:
+                        self._doc._after_transaction.remove(ref)
+                    else:
+                        callback()
 
     @property
     def origin(self) -> Any:
@@ -117,13 +161,14 @@ class NewTransaction(Transaction):
     """
 
     async def __aenter__(self) -> Transaction:
+        start = perf_counter()
         if self._doc._allow_multithreading:
-            if not await to_thread.run_sync(
-                partial(self._doc._txn_lock.acquire, timeout=self._timeout), abandon_on_cancel=True
-            ):
+            timeout = None if self._timeout < 0 else self._timeout
+            if not await self._doc._txn_lock.acquire_async(timeout=timeout):
                 raise TimeoutError("Could not acquire transaction")
         else:
             await self._doc._txn_async_lock.acquire()
+        self._lock_wait = perf_counter() - start
         return super().__enter__(_acquire_transaction=False)  # type: ignore[call-arg]
 
     async def __aexit__(
@@ -143,6 +188,147 @@ class ReadTransaction(Transaction):
     """
 
 
+class TransactionLock:
+    """
+    A lock that can be waited for both by threads and by coroutines.
+    Coroutines wait in their event loop, without using a worker thread.
+    The lock is held either exclusively, by a transaction, or shared, by any number of
+    readers that do not open a transaction (e.g. to encode an update).
+    The lock is handed over to waiters in the order they started waiting.
+    """
+
+    def __init__(self) -> None:
+        self._mutex = threading.Lock()
+        self._locked = False
+        self._readers = 0
+        self._waiters: deque[tuple[bool, Callable[[], object]]] = deque()
+
+    def locked(self) -> bool:
+        return self._locked
+
+    def acquire(self, timeout: float = -1, *, shared: bool = False) -> bool:
+        """
+        Waits for the lock in the current thread.
+
+        Args:
+            timeout: The maximum time to wait (in seconds), or -1 to wait forever.
+            shared: Whether to acquire the lock shared with other readers.
+
+        Returns:
+            True if the lock was acquired.
+        """
+        with self._mutex:
+            if self._try_acquire(shared):
+                return True
+            waiter = threading.Lock()
+            waiter.acquire()
+            entry = (shared, waiter.release)
+            self._waiters.append(entry)
+        waiter.acquire(timeout=timeout)
+        return self._stop_waiting(entry)
+
+    async def acquire_async(self, timeout: float | None = None, *, shared: bool = False) -> bool:
+        """
+        Waits for the lock in the current task.
+
+        Args:
+            timeout: The maximum time to wait (in seconds), or None to wait forever.
+            shared: Whether to acquire the lock shared with other readers.
+
+        Returns:
+            True if the lock was acquired.
+        """
+        with self._mutex:
+            if self._try_acquire(shared):
+                return True
+            event = Event()
+            entry = (shared, threadsafe_setter(event))
+            self._waiters.append(entry)
+        try:
+            with move_on_after(timeout):
+                await event.wait()
+        except BaseException:
+            if self._stop_waiting(entry):
+                self.release(shared=shared)
+            raise
+        return self._stop_waiting(entry)
+
+    def release(self, *, shared: bool = False) -> None:
+        """
+        Releases the lock, handing it over to the first waiter, if any, or to all the first
+        waiters if they acquire it shared.
+
+        Args:
+            shared: Whether the lock was acquired shared.
+        """
+        with self._mutex:
+            if shared:
+                if not self._readers:
+                    raise RuntimeError("Release unlocked lock")
+                self._readers -= 1
+            else:
+                if not self._locked:
+                    raise RuntimeError("Release unlocked lock")
+                self._locked = False
+            entries = self._hand_over()
+        for shared, wake in entries:
+            try:
+                wake()
+            except RuntimeError:
+                # the waiter's event loop is closed, hand over to the next waiter
+                self.release(shared=shared)
+
+    def _try_acquire(self, shared: bool) -> bool:
+        # must be called with the mutex held
+        if shared:
+            # readers do not overtake waiting transactions
+            if self._locked or self._waiters:
+                return False
+            self._readers += 1
+            return True
+        if self._locked or self._readers:
+            return False
+        self._locked = True
+        return True
+
+    def _hand_over(self) -> list[tuple[bool, Callable[[], object]]]:
+        # must be called with the mutex held, returns the waiters to wake up
+        if self._locked or self._readers or not self._waiters:
+            return []
+        entry = self._waiters.popleft()
+        if not entry[0]:
+            self._locked = True
+            return [entry]
+        entries = [entry]
+        while self._waiters and self._waiters[0][0]:
+            entries.append(self._waiters.popleft())
+        self._readers += len(entries)
+        return entries
+
+    def _stop_waiting(self, entry: tuple[bool, Callable[[], object]]) -> bool:
+        # returns True if the lock was handed over to the waiter
+        with self._mutex:
+            try:
+                self._waiters.remove(entry)
+            except ValueError:
+                return True
+            return False
+
+
+def threadsafe_setter(event: Event) -> Callable[[], object]:
+    """
+    Returns a function that sets the event from any thread, without blocking.
+    """
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        import trio
+
+        token = trio.lowlevel.current_trio_token()
+        return partial(token.run_sync_soon, event.set)
+    return partial(loop.call_soon_threadsafe, event.set)
+
+
 def hash_origin(origin: Any) -> int:
     try:
         return hash(origin)
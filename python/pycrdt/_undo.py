@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from time import time_ns
-from typing import TYPE_CHECKING, Any, Callable
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+from weakref import WeakMethod
 
 from ._base import BaseType
 from ._pycrdt import (
@@ -14,10 +14,7 @@ from ._transaction import hash_origin
 
 if TYPE_CHECKING:
     from ._doc import Doc
-
-
-def timestamp() -> int:
-    return time_ns() // 1_000_000
+    from ._transaction import Transaction
 
 
 class UndoManager:
@@ -28,6 +25,7 @@ class UndoManager:
     If initialized with a `Doc`, scopes can later be expanded.
     Changes can be undone/redone by batches using time intervals.
     It is possible to include/exclude changes by transaction origin in undo/redo operations.
+    The undo history can be bounded in number of items or in size.
     """
 
     def __init__(
@@ -36,14 +34,28 @@ class UndoManager:
         doc: Doc | None = None,
         scopes: list[BaseType] = [],
         capture_timeout_millis: int = 500,
-        timestamp: Callable[[], int] = timestamp,
+        timestamp: Callable[[], int] | None = None,
+        max_stack_items: int | None = None,
+        max_stack_bytes: int | None = None,
+        all_roots: bool = False,
     ) -> None:
         """
         Args:
             doc: The document the undo manager will work with.
             scopes: A list of shared types the undo manager will work with.
             capture_timeout_millis: A time interval for grouping changes that will be undone/redone.
-            timestamp: A function that returns a timestamp as an integer number of milli-seconds.
+            timestamp: A function that returns a timestamp as an integer number of milli-seconds,
+                or `None` to use a native monotonic clock (which avoids calling into Python
+                for every tracked transaction).
+            max_stack_items: The maximum number of items in the undo stack, if any.
+            max_stack_bytes: The maximum size (in bytes) of the undo and redo stacks, if any
+                (see [memory_usage][pycrdt.UndoManager.memory_usage]).
+                When a limit is exceeded after a transaction, the oldest items are dropped.
+                They are dropped in batches of about half of the limit. An item that alone
+                exceeds `max_stack_bytes` is still kept until the next change, so that it can
+                be undone.
+            all_roots: Whether to track all the root types of the document,
+                including the ones created later.
 
         Raises:
             RuntimeError: UndoManager must be created with doc or scopes.
@@ -54,10 +66,184 @@ class UndoManager:
             doc = scopes[0].doc
         elif scopes:
             raise RuntimeError("UndoManager must be created with doc or scopes")
-        self._undo_manager = _UndoManager(doc._doc, capture_timeout_millis, timestamp)
+        self._setup(doc, capture_timeout_millis, timestamp, max_stack_items, max_stack_bytes)
+        if self._bounded:
+            doc._after_transaction.append(WeakMethod(self._enforce_limits))
+        if all_roots:
+            self._all_roots = True
+            doc._root_trackers.append(WeakMethod(self._expand_scope_roots))
+            with doc.transaction() as txn:
+                self._expand_scope_roots(txn)
         for scope in scopes:
             self.expand_scope(scope)
 
+    @classmethod
+    def _for_group(
+        cls,
+        doc: Doc,
+        capture_timeout_millis: int,
+        max_stack_items: int | None,
+        max_stack_bytes: int | None,
+        all_roots: bool,
+    ) -> UndoManager:
+        # an UndoManagerGroup calls the hooks of its undo managers, so none is registered
+        undo_manager = cls.__new__(cls)
+        undo_manager._setup(doc, capture_timeout_millis, None, max_stack_items, max_stack_bytes)
+        if all_roots:
+            undo_manager._all_roots = True
+            undo_manager._expand_roots(undo_manager._undo_manager)
+        return undo_manager
+
+    def _setup(
+        self,
+        doc: Doc,
+        capture_timeout_millis: int,
+        timestamp: Callable[[], int] | None,
+        max_stack_items: int | None,
+        max_stack_bytes: int | None,
+    ) -> None:
+        self._doc = doc
+        self._capture_timeout_millis = capture_timeout_millis
+        self._timestamp = timestamp
+        self._scopes: list[BaseType] = []
+        self._origins: list[tuple[bool, int]] = []
+        self._all_roots = False
+        self._max_stack_items = max_stack_items
+        self._max_stack_bytes = max_stack_bytes
+        # The native undo manager cannot drop individual items, so a bounded history is split
+        # into generations of native undo managers, of which only the active one captures
+        # changes. Generations before the active one only hold undo items, and are dropped
+        # first when a limit is exceeded. Generations after it only hold redo items.
+        self._undo_manager = _UndoManager(doc._doc, capture_timeout_millis, timestamp)
+        self._generations = [self._undo_manager]
+        self._active = 0
+        # the size of each generation, with the finalized items of the active one counted once
+        self._sizes = [0]
+        self._finalized = 0
+        self._finalized_bytes = 0
+        self._redo_bytes = 0
+        self._active_state = (0, 0, 0)
+        self._bounded: bool = max_stack_items is not None or max_stack_bytes is not None
+
+    def _expand_scope_roots(self, txn: Transaction) -> None:
+        assert txn._txn is not None
+        for undo_manager in self._generations:
+            undo_manager.expand_scope_roots(txn._txn)
+
+    def _new_generation(self) -> _UndoManager:
+        undo_manager = _UndoManager(self._doc._doc, self._capture_timeout_millis, self._timestamp)
+        for scope in self._scopes:
+            getattr(undo_manager, f"expand_scope_{scope.type_name}")(scope._integrated)
+        for include, origin_hash in self._origins:
+            if include:
+                undo_manager.include_origin(origin_hash)
+            else:
+                undo_manager.exclude_origin(origin_hash)
+        if self._all_roots:
+            self._expand_roots(undo_manager)
+        return undo_manager
+
+    def _expand_roots(self, undo_manager: _UndoManager) -> None:
+        # a document transaction cannot be used here, since we may be entering or leaving one
+        txn = self._doc._doc.create_transaction()
+        try:
+            undo_manager.expand_scope_roots(txn)
+        finally:
+            txn.commit()
+            txn.drop()
+
+    def _activate(self, index: int) -> None:
+        self._undo_manager.set_capturing(False)
+        self._active = index
+        self._undo_manager = self._generations[index]
+        self._undo_manager.set_capturing(True)
+
+    def _refresh(self) -> None:
+        # recompute the size of the active generation, after it was undone or redone
+        undo_manager = self._undo_manager
+        undo_bytes, self._redo_bytes = undo_manager.memory_usage()
+        length = undo_manager.undo_stack_len()
+        self._finalized = max(length - 1, 0)
+        last = undo_manager.undo_item_size(length - 1) if length else 0
+        self._finalized_bytes = undo_bytes - (last or 0)
+        self._sizes[self._active] = undo_bytes + self._redo_bytes
+        self._active_state = self._state(last or 0)
+
+    def _update_active_size(self) -> None:
+        # only the last item of the active generation can grow, the other ones are counted once
+        undo_manager = self._undo_manager
+        length = undo_manager.undo_stack_len()
+        if length < self._finalized:
+            self._refresh()
+            return
+        while self._finalized < length - 1:
+            self._finalized_bytes += undo_manager.undo_item_size(self._finalized) or 0
+            self._finalized += 1
+        if self._redo_bytes and not undo_manager.redo_stack_len():
+            self._redo_bytes = 0
+        last = undo_manager.undo_item_size(length - 1) if length else 0
+        self._sizes[self._active] = self._finalized_bytes + (last or 0) + self._redo_bytes
+        self._active_state = self._state(last or 0)
+
+    def _state(self, last: int) -> tuple[int, int, int]:
+        undo_manager = self._undo_manager
+        return (undo_manager.undo_stack_len(), undo_manager.redo_stack_len(), last)
+
+    def _rotate(self) -> None:
+        # start a new generation after the active one when it is full, so that a generation
+        # holds at most about half of the limit
+        undo_manager = self._undo_manager
+        if undo_manager.redo_stack_len() or not (
+            (
+                self._max_stack_items is not None
+                and undo_manager.undo_stack_len() >= max(self._max_stack_items // 2, 1)
+            )
+            or (
+                self._max_stack_bytes is not None
+                and self._sizes[self._active] >= self._max_stack_bytes / 2
+            )
+        ):
+            return
+        self._generations.insert(self._active + 1, self._new_generation())
+        self._sizes.insert(self._active + 1, 0)
+        self._activate(self._active + 1)
+        self._refresh()
+
+    def _exceeds_limits(self) -> bool:
+        if self._max_stack_bytes is not None and sum(self._sizes) > self._max_stack_bytes:
+            return True
+        if self._max_stack_items is None:
+            return False
+        items = sum(
+            undo_manager.undo_stack_len() for undo_manager in self._generations[: self._active + 1]
+        )
+        return items > self._max_stack_items
+
+    def _enforce_limits(self) -> None:
+        generations = self._generations
+        undo_manager = self._undo_manager
+        length = undo_manager.undo_stack_len()
+        last = undo_manager.undo_item_size(length - 1) if length else 0
+        if self._state(last or 0) == self._active_state:
+            # the transaction did not change the tracked shared types
+            return
+        if self._active < len(generations) - 1:
+            # a new change cannot be followed by the redo items of the next generations
+            for generation in generations[self._active + 1 :]:
+                generation.clear()
+            del generations[self._active + 1 :]
+            del self._sizes[self._active + 1 :]
+        self._update_active_size()
+        self._rotate()
+        # the generation holding the last change is kept even if it alone exceeds the limits,
+        # it is dropped at the next change
+        kept = self._active if self._undo_manager.undo_stack_len() else self._active - 1
+        while kept > 0 and self._exceeds_limits():
+            generations.pop(0).clear()
+            self._sizes.pop(0)
+            self._active -= 1
+            kept -= 1
+
     def expand_scope(self, scope: BaseType) -> None:
         """
         Expands the scope of shared types for this undo manager.
@@ -65,8 +251,10 @@ class UndoManager:
         Args:
             scope: The shared type to include.
         """
-        method = getattr(self._undo_manager, f"expand_scope_{scope.type_name}")
-        method(scope._integrated)
+        self._scopes.append(scope)
+        for undo_manager in self._generations:
+            method = getattr(undo_manager, f"expand_scope_{scope.type_name}")
+            method(scope._integrated)
 
     def include_origin(self, origin: Any) -> None:
         """
@@ -75,7 +263,10 @@ class UndoManager:
         Args:
             origin: The origin to include.
         """
-        self._undo_manager.include_origin(hash_origin(origin))
+        origin_hash = hash_origin(origin)
+        self._origins.append((True, origin_hash))
+        for undo_manager in self._generations:
+            undo_manager.include_origin(origin_hash)
 
     def exclude_origin(self, origin: Any) -> None:
         """
@@ -84,14 +275,19 @@ class UndoManager:
         Args:
             origin: The origin to exclude.
         """
-        self._undo_manager.exclude_origin(hash_origin(origin))
+        origin_hash = hash_origin(origin)
+        self._origins.append((False, origin_hash))
+        for undo_manager in self._generations:
+            undo_manager.exclude_origin(origin_hash)
 
     def can_undo(self) -> bool:
         """
         Returns:
             True if there are changes to undo.
         """
-        return self._undo_manager.can_undo()
+        return any(
+            undo_manager.can_undo() for undo_manager in self._generations[: self._active + 1]
+        )
 
     def undo(self) -> bool:
         """
@@ -100,14 +296,22 @@ class UndoManager:
         Returns:
             True if some changes were undone.
         """
-        return self._undo_manager.undo()
+        index = self._active
+        while index > 0 and not self._generations[index].can_undo():
+            index -= 1
+        if index != self._active and self._generations[index].can_undo():
+            self._activate(index)
+        result = self._undo_manager.undo()
+        if self._bounded:
+            self._refresh()
+        return result
 
     def can_redo(self) -> bool:
         """
         Returns:
             True if there are changes to redo.
         """
-        return self._undo_manager.can_redo()
+        return any(undo_manager.can_redo() for undo_manager in self._generations[self._active :])
 
     def redo(self) -> bool:
         """
@@ -116,21 +320,247 @@ class UndoManager:
         Returns:
             True if some changes were redone.
         """
-        return self._undo_manager.redo()
+        index = self._active
+        while index < len(self._generations) - 1 and not self._generations[index].can_redo():
+            index += 1
+        if index != self._active and self._generations[index].can_redo():
+            self._activate(index)
+        result = self._undo_manager.redo()
+        if self._bounded:
+            self._refresh()
+            self._rotate()
+        return result
 
     def clear(self) -> None:
         """
         Clears all [StackItem][pycrdt.StackItem]s stored in this undo manager,
-        effectively resetting its state.
+        effectively resetting its state. This can be used to drop the undo history
+        of idle documents.
         """
-        self._undo_manager.clear()
+        for undo_manager in self._generations:
+            undo_manager.clear()
+        self._generations = [self._undo_manager]
+        self._active = 0
+        self._sizes = [0]
+        self._refresh()
+
+    @property
+    def memory_usage(self) -> int:
+        """The size (in bytes) of the encoded undo and redo stacks."""
+        if self._bounded:
+            return sum(self._sizes)
+        return sum(self._undo_manager.memory_usage())
 
     @property
     def undo_stack(self) -> list[StackItem]:
         """The list of undoable actions."""
-        return self._undo_manager.undo_stack()
+        return [
+            item
+            for undo_manager in self._generations[: self._active + 1]
+            for item in undo_manager.undo_stack()
+        ]
 
     @property
     def redo_stack(self) -> list[StackItem]:
         """The list of redoable actions."""
-        return self._undo_manager.redo_stack()
+        return [
+            item
+            for undo_manager in reversed(self._generations[self._active :])
+            for item in undo_manager.redo_stack()
+        ]
+
+
+class UndoManagerGroup:
+    """
+    A group of undo managers with separate undo/redo stacks per transaction origin,
+    e.g. one per remote user editing a server-side document, so that each user's undo
+    only affects their own changes.
+    An undo manager is only kept for the origins whose transactions changed the tracked
+    shared types, so that origins that never make changes leave nothing behind.
+    The group registers a single Python hook on the document, which only handles the
+    undo manager of the transaction's origin. However, each undo manager wraps native
+    undo managers (several when its history is bounded), and each of them subscribes to
+    the document natively, so the native cost of every transaction grows with the number
+    of origins that made changes. Undo managers of users who left should be
+    [removed][pycrdt.UndoManagerGroup.remove].
+
+    ```py
+    undo_managers = UndoManagerGroup(doc=doc, all_roots=True)
+
+    with doc.transaction(origin=user_id):
+        text += "Hello"
+
+    undo_managers.undo(user_id)
+    ```
+    """
+
+    def __init__(
+        self,
+        *,
+        doc: Doc | None = None,
+        scopes: list[BaseType] = [],
+        capture_timeout_millis: int = 500,
+        max_stack_items: int | None = None,
+        max_stack_bytes: int | None = None,
+        all_roots: bool = False,
+        exclude_origins: list[Any] = [],
+    ) -> None:
+        """
+        Args:
+            doc: The document the undo managers will work with.
+            scopes: A list of shared types the undo managers will work with.
+            capture_timeout_millis: A time interval for grouping changes that will be undone/redone.
+            max_stack_items: The maximum number of items in each undo stack, if any.
+            max_stack_bytes: The maximum size (in bytes) of the stacks of each undo manager,
+                if any.
+            all_roots: Whether to track all the root types of the document,
+                including the ones created later.
+            exclude_origins: The transaction origins that never get an undo manager,
+                e.g. the origin used to apply remote updates.
+
+        Raises:
+            RuntimeError: UndoManagerGroup must be created with doc or scopes.
+        """
+        if doc is None:
+            if not scopes:
+                raise RuntimeError("UndoManagerGroup must be created with doc or scopes")
+            doc = scopes[0].doc
+        elif scopes:
+            raise RuntimeError("UndoManagerGroup must be created with doc or scopes")
+        self._doc = doc
+        self._scopes = list(scopes)
+        self._capture_timeout_millis = capture_timeout_millis
+        self._max_stack_items = max_stack_items
+        self._max_stack_bytes = max_stack_bytes
+        self._all_roots = all_roots
+        self._exclude_origins = list(exclude_origins)
+        self._undo_managers: dict[Any, UndoManager] = {}
+        # the undo manager of the ongoing transaction, and whether it was created for it
+        self._current: tuple[Any, bool] | None = None
+        doc._origin_trackers.append(WeakMethod(self._track_origin))
+        doc._after_transaction.append(WeakMethod(self._after_transaction))
+        if all_roots:
+            doc._root_trackers.append(WeakMethod(self._expand_scope_roots))
+
+    def _track_origin(self, origin: Any) -> None:
+        # called before a transaction with this origin is created
+        if origin in self._exclude_origins:
+            return
+        if origin in self._undo_managers:
+            self._current = (origin, False)
+            return
+        # the undo manager must exist before the transaction to capture its changes
+        undo_manager = UndoManager._for_group(
+            self._doc,
+            self._capture_timeout_millis,
+            self._max_stack_items,
+            self._max_stack_bytes,
+            self._all_roots,
+        )
+        undo_manager.include_origin(origin)
+        for scope in self._scopes:
+            undo_manager.expand_scope(scope)
+        self._undo_managers[origin] = undo_manager
+        self._current = (origin, True)
+
+    def _after_transaction(self) -> None:
+        if self._current is None:
+            return
+        origin, created = self._current
+        self._current = None
+        undo_manager = self._undo_managers.get(origin)
+        if undo_manager is None:
+            return
+        if created and not undo_manager.can_undo():
+            # the transaction did not change the tracked shared types
+            del self._undo_managers[origin]
+        elif undo_manager._bounded:
+            undo_manager._enforce_limits()
+
+    def _expand_scope_roots(self, txn: Transaction) -> None:
+        for undo_manager in self._undo_managers.values():
+            undo_manager._expand_scope_roots(txn)
+
+    def __getitem__(self, origin: Any) -> UndoManager:
+        """
+        Args:
+            origin: The transaction origin.
+
+        Returns:
+            The undo manager of the given origin.
+
+        Raises:
+            KeyError: No transaction with this origin was made.
+        """
+        return self._undo_managers[origin]
+
+    def __contains__(self, origin: Any) -> bool:
+        return origin in self._undo_managers
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._undo_managers)
+
+    def __len__(self) -> int:
+        return len(self._undo_managers)
+
+    def remove(self, origin: Any) -> None:
+        """
+        Removes the undo manager of an origin, e.g. when a user leaves.
+
+        Args:
+            origin: The transaction origin.
+        """
+        del self._undo_managers[origin]
+
+    def can_undo(self, origin: Any) -> bool:
+        """
+        Args:
+            origin: The transaction origin.
+
+        Returns:
+            True if there are changes to undo for the given origin.
+        """
+        undo_manager = self._undo_managers.get(origin)
+        return False if undo_manager is None else undo_manager.can_undo()
+
+    def undo(self, origin: Any) -> bool:
+        """
+        Undoes the last changes of the given origin.
+
+        Args:
+            origin: The transaction origin.
+
+        Returns:
+            True if some changes were undone.
+        """
+        undo_manager = self._undo_managers.get(origin)
+        return False if undo_manager is None else undo_manager.undo()
+
+    def can_redo(self, origin: Any) -> bool:
+        """
+        Args:
+            origin: The transaction origin.
+
+        Returns:
+            True if there are changes to redo for the given origin.
+        """
+        undo_manager = self._undo_managers.get(origin)
+        return False if undo_manager is None else undo_manager.can_redo()
+
+    def redo(self, origin: Any) -> bool:
+        """
+        Redoes the last changes of the given origin that were undone.
+
+        Args:
+            origin: The transaction origin.
+
+        Returns:
+            True if some changes were redone.
+        """
+        undo_manager = self._undo_managers.get(origin)
+        return False if undo_manager is None else undo_manager.redo()
+
+    @property
+    def memory_usage(self) -> int:
+        """The size (in bytes) of the encoded stacks of all the undo managers."""
+        return sum(undo_manager.memory_usage for undo_manager in self._undo_managers.values())
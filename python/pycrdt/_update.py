@@ -1,7 +1,16 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Callable, TypeVar
+
+from anyio import CapacityLimiter, to_process, to_thread
+
 from ._pycrdt import get_state as _get_state
 from ._pycrdt import get_update as _get_update
 from ._pycrdt import merge_updates as _merge_updates
 
+T = TypeVar("T")
+
 
 def get_state(update: bytes) -> bytes:
     """
@@ -42,3 +51,72 @@ def merge_updates(*updates: bytes) -> bytes:
         The merged updates.
     """
     return _merge_updates(updates)
+
+
+async def aget_state(
+    update: bytes, *, process: bool = False, limiter: CapacityLimiter | None = None
+) -> bytes:
+    """
+    Same as [get_state()][pycrdt.get_state], but runs in a worker thread (or process),
+    without blocking the event loop.
+
+    Args:
+        update: The update from which to get the state.
+        process: Whether to run in a worker process instead of a worker thread.
+        limiter: An optional capacity limiter for the worker threads (or processes).
+
+    Returns:
+        The state corresponding to the update.
+    """
+    return await _run_sync(partial(_get_state, update), process=process, limiter=limiter)
+
+
+async def aget_update(
+    update: bytes,
+    state: bytes,
+    *,
+    process: bool = False,
+    limiter: CapacityLimiter | None = None,
+) -> bytes:
+    """
+    Same as [get_update()][pycrdt.get_update], but runs in a worker thread (or process),
+    without blocking the event loop.
+
+    Args:
+        update: The update from which to get all missing changes in the given state.
+        state: The state from which to get missing changes that are in the given update.
+        process: Whether to run in a worker process instead of a worker thread.
+        limiter: An optional capacity limiter for the worker threads (or processes).
+
+    Returns:
+        The changes from the given update not present in the given state.
+    """
+    return await _run_sync(partial(_get_update, update, state), process=process, limiter=limiter)
+
+
+async def amerge_updates(
+    *updates: bytes, process: bool = False, limiter: CapacityLimiter | None = None
+) -> bytes:
+    """
+    Same as [merge_updates()][pycrdt.merge_updates], but runs in a worker thread (or process),
+    without blocking the event loop.
+
+    Args:
+        updates: The updates to merge.
+        process: Whether to run in a worker process instead of a worker thread.
+        limiter: An optional capacity limiter for the worker threads (or processes).
+
+    Returns:
+        The merged updates.
+    """
+    return await _run_sync(partial(_merge_updates, updates), process=process, limiter=limiter)
+
+
+async def _run_sync(
+    func: Callable[[], T], *, process: bool = False, limiter: CapacityLimiter | None = None
+) -> T:
+    # the native functions release the GIL, so worker threads run them in parallel
+    # without copying the updates, while worker processes need them to be pickled
+    if process:
+        return await to_process.run_sync(func, limiter=limiter)
+    return await to_thread.run_sync(func, limiter=limiter)
@@ -1,17 +1,20 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Iterator, overload
+from typing import TYPE_CHECKING, Iterator, cast, overload
+from xml.etree import ElementTree
 
 from ._base import BaseEvent, BaseType, base_types, event_types
 from ._pycrdt import XmlElement as _XmlElement
 from ._pycrdt import XmlEvent as _XmlEvent
 from ._pycrdt import XmlFragment as _XmlFragment
 from ._pycrdt import XmlText as _XmlText
+from ._sticky_index import Assoc, StickyIndex
 
 if TYPE_CHECKING:
     from typing import Any, Iterable, Mapping, Sized, TypeVar
 
     from ._doc import Doc
+    from ._transaction import Transaction
 
     T = TypeVar("T")
 
@@ -26,6 +29,56 @@ def _integrated_to_wrapper(
     return XmlText(_doc=doc, _integrated=inner)
 
 
+def _xml_to_dicts(xml: str) -> list[dict[str, Any]]:
+    root = ElementTree.fromstring(f"<root>{xml}</root>")
+    return _element_to_dict(root)["children"]
+
+
+def _element_to_dict(element: ElementTree.Element) -> dict[str, Any]:
+    children: list[dict[str, Any]] = []
+    if element.text:
+        children.append({"delta": [{"insert": element.text}]})
+    for child in element:
+        children.append(_element_to_dict(child))
+        if child.tail:
+            children.append({"delta": [{"insert": child.tail}]})
+    return {"tag": element.tag, "attributes": dict(element.attrib), "children": children}
+
+
+def _prelim_to_dict(
+    node: str | XmlElement | XmlText,
+    wrappers: list[XmlElement | XmlText | None],
+    shared_attrs: list[tuple[XmlElement, str, BaseType]],
+) -> dict[str, Any]:
+    # wrappers are collected depth-first, in document order,
+    # shared type attributes can only be set once their element is integrated
+    if isinstance(node, str):
+        wrappers.append(None)
+        return {"delta": [{"insert": node}] if node else []}
+    if isinstance(node, XmlText):
+        if node._integrated is not None:
+            raise ValueError("Cannot insert an integrated XmlText")
+        wrappers.append(node)
+        return {"delta": [{"insert": node.prelim}] if node.prelim else []}
+    if isinstance(node, XmlElement):
+        if node._integrated is not None:
+            raise ValueError("Cannot insert an integrated XmlElement")
+        wrappers.append(node)
+        tag, attrs, contents = node.prelim
+        attributes = {}
+        for key, value in attrs:
+            if isinstance(value, BaseType):
+                shared_attrs.append((node, key, value))
+            else:
+                attributes[key] = value
+        return {
+            "tag": tag,
+            "attributes": attributes,
+            "children": [_prelim_to_dict(child, wrappers, shared_attrs) for child in contents],
+        }
+    raise TypeError("Cannot add value to XML: " + repr(node))
+
+
 def _check_slice(value: Sized, key: slice) -> tuple[int, int]:
     if key.step is not None:
         raise RuntimeError("Step not supported")
@@ -61,6 +114,30 @@ class _XmlBaseMixin(BaseType):
         with self.doc.transaction() as txn:
             return self.integrated.get_string(txn._txn)
 
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Exports this node and all its descendants in a single native call:
+        ```py
+        {
+            "tag": "p",  # for an XmlElement
+            "attributes": {"class": "foo"},  # for an XmlElement
+            "children": [  # for an XmlElement or an XmlFragment
+                {"delta": [{"insert": "Hello", "attributes": {"bold": True}}]},  # an XmlText
+            ],
+        }
+        ```
+        An `XmlText` is exported as its formatted chunks
+        (see [XmlText.diff()][pycrdt.XmlText.diff]).
+        Shared types held in attributes or embeds are exported as their plain value (a `Text` as
+        a string, an `Array` as a list, a `Map` as a dict), so that the result can be serialized
+        to JSON.
+
+        Returns:
+            The structure of the node, with dicts and lists.
+        """
+        with self.doc.transaction() as txn:
+            return self.integrated.to_dict(txn._txn)
+
     def __eq__(self, other: object):
         if not isinstance(other, _XmlBaseMixin):
             return False
@@ -80,6 +157,85 @@ class _XmlFragmentTraitMixin(_XmlBaseMixin):
         """
         return XmlChildrenView(self)
 
+    def iter_dicts(self) -> Iterator[dict[str, Any]]:
+        """
+        A streaming variant of [to_dict()][pycrdt.XmlFragment.to_dict], for very large trees.
+        Each child is exported in its own transaction.
+
+        Returns:
+            An iterator over the exported children (see [to_dict()][pycrdt.XmlFragment.to_dict]).
+        """
+        for child in self.children:
+            yield child.to_dict()
+
+    def insert_tree(
+        self, index: int, tree: str | dict[str, Any] | Iterable[dict[str, Any]]
+    ) -> list[XmlElement | XmlText]:
+        """
+        Inserts a whole tree of nodes at the given index, in a single native call:
+        ```py
+        fragment.insert_tree(0, "<p>Hello <b>world</b></p>")
+        fragment.insert_tree(0, {"tag": "p", "children": [{"delta": [{"insert": "Hello"}]}]})
+        ```
+
+        Args:
+            index: The index at which to insert the nodes.
+            tree: An XML string, a node or a list of nodes in the format of
+                [to_dict()][pycrdt.XmlFragment.to_dict]. The children of a fragment are inserted.
+
+        Raises:
+            IndexError: Index out of bounds.
+            ValueError: A node is neither an element nor a text.
+
+        Returns:
+            The inserted top-level nodes.
+        """
+        if isinstance(tree, str):
+            nodes = _xml_to_dicts(tree)
+        elif isinstance(tree, dict):
+            nodes = [tree] if "tag" in tree or "delta" in tree else tree["children"]
+        else:
+            nodes = list(tree)
+        doc = self.doc
+        with doc.transaction() as txn:
+            self._forbid_read_transaction(txn)
+            if index > self.integrated.len(txn._txn):
+                raise IndexError(index)
+            inserted = self.integrated.insert_tree(txn._txn, index, nodes)
+        return [
+            cast("XmlElement | XmlText", _integrated_to_wrapper(doc, node)) for node in inserted
+        ]
+
+    def _insert_prelims(
+        self, txn: Transaction, index: int, nodes: Iterable[str | XmlElement | XmlText]
+    ) -> None:
+        assert txn._txn is not None
+        wrappers: list[XmlElement | XmlText | None] = []
+        shared_attrs: list[tuple[XmlElement, str, BaseType]] = []
+        trees = [_prelim_to_dict(node, wrappers, shared_attrs) for node in nodes]
+        inserted = self.integrated.insert_tree(txn._txn, index, trees)
+        integrated: list[_XmlElement | _XmlText] = []
+        for node in inserted:
+            integrated.append(node)
+            if isinstance(node, _XmlElement):
+                integrated.extend(node.walk(txn._txn))
+        for wrapper, node in zip(wrappers, integrated):
+            if wrapper is not None:
+                wrapper._integrate(self.doc, node)
+        for element, key, value in shared_attrs:
+            element.attributes[key] = value
+
+    def walk(self) -> Iterator[XmlElement | XmlText]:
+        """
+        Returns:
+            An iterator over all the descendant nodes, depth-first and in document order.
+                The nodes are fetched in a single pass.
+        """
+        with self.doc.transaction() as txn:
+            nodes = self.integrated.walk(txn._txn)
+        doc = self.doc
+        return (cast("XmlElement | XmlText", _integrated_to_wrapper(doc, node)) for node in nodes)
+
 
 class _XmlTraitMixin(_XmlBaseMixin):
     _integrated: _XmlElement | _XmlText | None
@@ -120,18 +276,18 @@ class XmlFragment(_XmlFragmentTraitMixin):
     def _init(self, value: list[XmlElement | str] | None) -> None:
         if value is None:
             return
-        for obj in value:
-            self.children.append(obj)
+        with self.doc.transaction() as txn:
+            self._insert_prelims(txn, len(self.children), value)
 
 
 class XmlElement(_XmlFragmentTraitMixin, _XmlTraitMixin):
-    _prelim: tuple[str, list[tuple[str, str]], list[str | XmlElement | XmlText]] | None
+    _prelim: tuple[str, list[tuple[str, Any]], list[str | XmlElement | XmlText]] | None
     _integrated: _XmlElement | None
 
     def __init__(
         self,
         tag: str | None = None,
-        attributes: dict[str, str] | Iterable[tuple[str, str]] | None = None,
+        attributes: dict[str, Any] | Iterable[tuple[str, Any]] | None = None,
         contents: Iterable[XmlFragment | XmlElement | XmlText] | None = None,
         *,
         _doc: Doc | None = None,
@@ -142,7 +298,8 @@ class XmlElement(_XmlFragmentTraitMixin, _XmlTraitMixin):
 
         Args:
             tag: The tag of the element (required).
-            attributes: The optional attributes of the element.
+            attributes: The optional attributes of the element. Their values can be of any
+                type supported by a [Map][pycrdt.Map], including shared types.
             contents: The optional contents of the element.
         """
         if _integrated is not None:
@@ -174,15 +331,14 @@ class XmlElement(_XmlFragmentTraitMixin, _XmlTraitMixin):
         raise ValueError("Cannot get an XmlElement from a doc, get an XmlFragment instead")
 
     def _init(
-        self, value: tuple[str, list[tuple[str, str]], list[str | XmlElement | XmlText]] | None
+        self, value: tuple[str, list[tuple[str, Any]], list[str | XmlElement | XmlText]] | None
     ):
         assert value is not None
         _, attrs, contents = value
-        with self.doc.transaction():
+        with self.doc.transaction() as txn:
             for k, v in attrs:
                 self.attributes[k] = v
-            for child in contents:
-                self.children.append(child)
+            self._insert_prelims(txn, len(self.children), contents)
 
     @property
     def tag(self) -> str | None:
@@ -282,16 +438,87 @@ class XmlText(_XmlTraitMixin):
             if length > 0:
                 self.integrated.format(txn._txn, start, length, iter(attrs.items()))
 
-    def diff(self) -> list[tuple[Any, dict[str, Any] | None]]:
+    def sticky_index(self, index: int, assoc: Assoc = Assoc.AFTER) -> StickyIndex:
         """
+        Creates a position that keeps pointing to the same place when text is
+        inserted or removed before it (see [StickyIndex][pycrdt.StickyIndex]).
+
+        Args:
+            index: The index in the text.
+            assoc: The side of the index the position sticks to.
+
+        Raises:
+            IndexError: Index out of bounds.
+
+        Returns:
+            The sticky index.
+        """
+        return StickyIndex.new(self, index, assoc)
+
+    def apply_delta(self, delta: Iterable[dict[str, Any]]) -> None:
+        """
+        Applies a delta in a single native call, for instance coming from a rich-text editor:
+        ```py
+        text.apply_delta([{"retain": 6}, {"insert": "World", "attributes": {"bold": True}}])
+        ```
+
+        Args:
+            delta: The operations, in the format of [TextEvent.delta][pycrdt.TextEvent]:
+                `{"insert": str | Any, "attributes": dict}`, `{"retain": int, "attributes": dict}`
+                or `{"delete": int}`.
+                Inserts without attributes are not formatted.
+
+        Raises:
+            ValueError: An operation is invalid, or goes past the end of the text.
+        """
+        with self.doc.transaction() as txn:
+            self._forbid_read_transaction(txn)
+            self.integrated.apply_delta(txn._txn, list(delta))
+
+    def diff(
+        self, start: int = 0, stop: int | None = None
+    ) -> list[tuple[Any, dict[str, Any] | None]]:
+        """
+        Args:
+            start: The index at which the chunks start (included).
+            stop: The index at which the chunks stop (excluded), or `None` for the end of the text.
+                The first and last chunks are cut at the range boundaries.
+
         Returns:
             A list of formatted chunks that the current text corresponds to.
                 Each list item is a tuple containing the chunk's contents and formatting attributes.
                 The contents is usually the text as a string, but may be other data for embedded
                 objects.
+
+        Raises:
+            ValueError: `stop` is smaller than `start`, or a range boundary falls inside a
+                character.
+        """
+        with self.doc.transaction() as txn:
+            return self.integrated.diff(txn._txn, start, stop)
+
+    def iter_diff(
+        self, start: int = 0, stop: int | None = None
+    ) -> Iterator[tuple[Any, dict[str, Any] | None]]:
+        """
+        A variant of [diff()][pycrdt.XmlText.diff] that converts the chunks to Python objects
+        one at a time while iterating, for instance to render only what fits in a view.
+        The formatted chunks of the whole text are still computed up front, and their embeds
+        converted, so this only saves the conversion of the strings that are not iterated over.
+
+        Args:
+            start: The index at which the chunks start (included).
+            stop: The index at which the chunks stop (excluded), or `None` for the end of the text.
+
+        Returns:
+            An iterator over the formatted chunks, as of the time of the call.
+
+        Raises:
+            ValueError: `stop` is smaller than `start`, or a range boundary falls inside a
+                character.
         """
         with self.doc.transaction() as txn:
-            return self.integrated.diff(txn._txn)
+            return self.integrated.iter_diff(txn._txn, start, stop)
 
     def __delitem__(self, key: int | slice) -> None:
         with self.doc.transaction() as txn:
@@ -317,10 +544,10 @@ class XmlEvent(BaseEvent):
 
 class XmlAttributesView:
     """
-    A list-like view into an [XmlFragment][pycrdt.XmlFragment] or [XmlElement][pycrdt.XmlElement]'s
-    child nodes.
+    A dict-like view into an [XmlElement][pycrdt.XmlElement] or [XmlText][pycrdt.XmlText]'s
+    attributes.
 
-    Supports `len`, `in`, and getting, setting, and deleting by index. Iteration will iterate over
+    Supports `len`, `in`, and getting, setting, and deleting by name. Iteration will iterate over
     key/value tuples.
     """
 
@@ -341,7 +568,21 @@ class XmlAttributesView:
             v = self.inner.integrated.attribute(txn._txn, key)
             if v is None:
                 return None
-            return v
+            return self.inner._maybe_as_type_or_doc(v)
+
+    def get_many(self, keys: Iterable[str]) -> list[Any | None]:
+        """
+        Gets several attributes in a single native call.
+
+        Args:
+            keys: The names of the attributes to get.
+
+        Returns:
+            The values of the attributes, with `None` for the attributes that do not exist.
+        """
+        with self.inner.doc.transaction() as txn:
+            values = self.inner.integrated.get_attributes(txn._txn, list(keys))
+        return [None if v is None else self.inner._maybe_as_type_or_doc(v) for v in values]
 
     def __getitem__(self, key: str) -> Any:
         """
@@ -354,20 +595,27 @@ class XmlAttributesView:
         Returns:
             The attribute's value.
         """
-        v = self.get(key)
-        if v is None:
-            raise KeyError(key)
-        return v
+        with self.inner.doc.transaction() as txn:
+            v = self.inner.integrated.attribute(txn._txn, key)
+            if v is None and not self.inner.integrated.has_attribute(txn._txn, key):
+                raise KeyError(key)
+            return self.inner._maybe_as_type_or_doc(v)
 
     def __setitem__(self, key: str, value: Any) -> None:
         """
         Args:
             key: The name of the attribute to set.
-            value: The value of the attribute.
+            value: The value of the attribute, of any type supported by a [Map][pycrdt.Map],
+                including shared types.
         """
         with self.inner.doc.transaction() as txn:
             self.inner._forbid_read_transaction(txn)
-            self.inner.integrated.insert_attribute(txn._txn, key, value)
+            if isinstance(value, BaseType):
+                # shared type
+                assert txn._txn is not None
+                self.inner._do_and_integrate("insert_attribute", value, txn._txn, key)
+            else:
+                self.inner.integrated.insert_attribute(txn._txn, key, value)
 
     def __delitem__(self, key: str) -> None:
         """
@@ -386,7 +634,8 @@ class XmlAttributesView:
         Returns:
             `True` if the attribute with the given name exists.
         """
-        return self.get(key) is not None
+        with self.inner.doc.transaction() as txn:
+            return self.inner.integrated.has_attribute(txn._txn, key)
 
     def __len__(self) -> int:
         """
@@ -394,15 +643,31 @@ class XmlAttributesView:
             The number of attributes.
         """
         with self.inner.doc.transaction() as txn:
-            return len(self.inner.integrated.attributes(txn._txn))
+            return self.inner.integrated.attributes_len(txn._txn)
 
     def __iter__(self) -> Iterable[tuple[str, Any]]:
         """
         Returns:
             An iterable over each attribute, as key/value tuples.
         """
+        return self.items()
+
+    def keys(self) -> Iterable[str]:
+        """
+        Returns:
+            An iterable over the names of the attributes, without fetching their values.
+        """
         with self.inner.doc.transaction() as txn:
-            return iter(self.inner.integrated.attributes(txn._txn))
+            return iter(self.inner.integrated.attribute_keys(txn._txn))
+
+    def items(self) -> Iterable[tuple[str, Any]]:
+        """
+        Returns:
+            An iterable over each attribute, as key/value tuples.
+        """
+        with self.inner.doc.transaction() as txn:
+            attributes = self.inner.integrated.attributes(txn._txn)
+        return ((key, self.inner._maybe_as_type_or_doc(value)) for key, value in attributes)
 
 
 class XmlChildrenView:
@@ -478,9 +743,10 @@ class XmlChildrenView:
         Returns:
             An iterable over child nodes.
         """
-        with self.inner.doc.transaction():
-            children = [self[i] for i in range(len(self))]
-        return iter(children)
+        doc = self.inner.doc
+        with doc.transaction() as txn:
+            children = self.inner.integrated.children(txn._txn)
+        return (_integrated_to_wrapper(doc, child) for child in children)
 
     @overload
     def insert(self, index: int, element: str | XmlText) -> XmlText: ...
@@ -515,12 +781,8 @@ class XmlChildrenView:
                 element._integrate(self.inner.doc, integrated)
                 return element
             elif isinstance(element, XmlElement):
-                if element._integrated is not None:
-                    raise ValueError("Cannot insert an integrated XmlElement")
-                prelim = element.prelim
-                integrated = self.inner.integrated.insert_element_prelim(txn._txn, index, prelim[0])
-                element._integrate(self.inner.doc, integrated)
-                element._init(prelim)
+                # the element, its attributes and its contents are inserted at once
+                self.inner._insert_prelims(txn, index, [element])
                 return element
             else:
                 raise TypeError("Cannot add value to XML: " + repr(element))
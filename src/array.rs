@@ -3,13 +3,14 @@ use pyo3::IntoPyObjectExt;
 use pyo3::exceptions::{PyValueError, PyTypeError};
 use pyo3::types::{PyList, PyString};
 use yrs::{
-    Any, Array as _Array, ArrayRef, DeepObservable, Doc as _Doc, Observable, TransactionMut, XmlFragmentPrelim
+    Any, Array as _Array, ArrayRef, DeepObservable, Doc as _Doc, IndexedSequence, Observable, TransactionMut, XmlFragmentPrelim
 };
 use yrs::types::ToJson;
 use yrs::types::text::TextPrelim;
 use yrs::types::array::{ArrayPrelim, ArrayEvent as _ArrayEvent};
 use yrs::types::map::MapPrelim;
 use crate::transaction::Transaction;
+use crate::sticky_index::{assoc_from, StickyIndex};
 use crate::subscription::Subscription;
 use crate::type_conversions::{events_into_py, py_to_any, ToPython};
 use crate::text::Text;
@@ -115,6 +116,12 @@ impl Array {
         Ok(())
     }
 
+    fn sticky_index(&self, txn: &mut Transaction, index: u32, assoc: i32) -> Option<StickyIndex> {
+        let mut _t = txn.transaction();
+        let t = _t.as_mut().unwrap().as_mut();
+        self.array.sticky_index(t, index, assoc_from(assoc)).map(StickyIndex::from)
+    }
+
     fn get<'py>(&self, py: Python<'py>, txn: &mut Transaction, index: u32) -> PyResult<Bound<'py, PyAny>> {
         let mut t0 = txn.transaction();
         let t1 = t0.as_mut().unwrap();
@@ -127,12 +134,13 @@ impl Array {
         }
     }
 
-    fn to_json<'py>(&mut self, py: Python<'py>, txn: &mut Transaction) -> Bound<'py, PyString> {
-        let mut t0 = txn.transaction();
-        let t1 = t0.as_mut().unwrap();
-        let t = t1.as_ref();
-        let mut s = String::new();
-        self.array.to_json(t).to_json(&mut s);
+    fn to_json<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Bound<'py, PyString> {
+        let array = &self.array;
+        let s = txn.read_without_gil(py, |t| {
+            let mut s = String::new();
+            array.to_json(t).to_json(&mut s);
+            s
+        });
         PyString::new(py, s.as_str())
     }
 
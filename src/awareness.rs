@@ -0,0 +1,39 @@
+use pyo3::prelude::*;
+use pyo3::exceptions::PyValueError;
+use pyo3::types::PyBytes;
+use yrs::encoding::read::{Cursor, Error, Read};
+use yrs::encoding::write::Write;
+
+#[pyfunction]
+pub fn encode_awareness_update<'py>(py: Python<'py>, clients: Vec<(u64, u64, String)>) -> Bound<'py, PyBytes> {
+    let mut buf: Vec<u8> = Vec::new();
+    buf.write_var(clients.len());
+    for (client_id, clock, state) in clients.iter() {
+        buf.write_var(*client_id);
+        buf.write_var(*clock);
+        buf.write_string(state);
+    }
+    PyBytes::new(py, &buf)
+}
+
+#[pyfunction]
+pub fn decode_awareness_update(update: &Bound<'_, PyBytes>) -> PyResult<Vec<(u64, u64, String)>> {
+    let update: &[u8] = update.extract()?;
+    let Ok(clients) = read_clients(update) else {
+        return Err(PyValueError::new_err("Cannot decode awareness update"));
+    };
+    Ok(clients)
+}
+
+fn read_clients(update: &[u8]) -> Result<Vec<(u64, u64, String)>, Error> {
+    let mut cursor = Cursor::new(update);
+    let len: usize = cursor.read_var()?;
+    let mut clients = Vec::with_capacity(len.min(update.len()));
+    for _ in 0..len {
+        let client_id: u64 = cursor.read_var()?;
+        let clock: u64 = cursor.read_var()?;
+        let state = cursor.read_string()?;
+        clients.push((client_id, clock, state.to_string()));
+    }
+    Ok(clients)
+}
@@ -1,10 +1,13 @@
 use pyo3::prelude::*;
 use pyo3::IntoPyObjectExt;
 use pyo3::exceptions::{PyRuntimeError, PyValueError};
-use pyo3::types::{PyBytes, PyDict, PyInt, PyList};
+use pyo3::types::{PyBytes, PyDict, PyInt, PyList, PySet};
 use yrs::{
-    Doc as _Doc, ReadTxn, StateVector, SubdocsEvent as _SubdocsEvent, Transact, TransactionCleanupEvent, TransactionMut, Update, WriteTxn
+    Doc as _Doc, ID, OffsetKind, Options, ReadTxn, StateVector, SubdocsEvent as _SubdocsEvent, Transact, TransactionCleanupEvent, TransactionMut, Update, WriteTxn
 };
+use yrs::block::{Item, ItemContent};
+use yrs::branch::{Branch, BranchID, BranchPtr};
+use yrs::types::{PathSegment, TypePtr};
 use yrs::updates::encoder::Encode;
 use yrs::updates::decoder::Decode;
 use crate::text::Text;
@@ -31,14 +34,28 @@ impl Doc {
 #[pymethods]
 impl Doc {
     #[new]
-    fn new(client_id: &Bound<'_, PyAny>) -> Self {
-        if client_id.is_none() {
-            let doc = _Doc::new();
-            return Doc { doc };
+    #[pyo3(signature = (client_id, offset_kind=None))]
+    fn new(client_id: &Bound<'_, PyAny>, offset_kind: Option<&str>) -> PyResult<Self> {
+        let mut options = if client_id.is_none() {
+            Options::default()
+        } else {
+            let id: u64 = client_id.downcast::<PyInt>().unwrap().extract().unwrap();
+            Options::with_client_id(id)
+        };
+        options.offset_kind = match offset_kind {
+            None | Some("bytes") => OffsetKind::Bytes,
+            Some("utf16") => OffsetKind::Utf16,
+            Some(other) => return Err(PyValueError::new_err(format!("Unsupported offset kind: {other}"))),
+        };
+        let doc = _Doc::with_options(options);
+        Ok(Doc { doc })
+    }
+
+    fn offset_kind(&self) -> &'static str {
+        match self.doc.options().offset_kind {
+            OffsetKind::Utf16 => "utf16",
+            _ => "bytes",
         }
-        let id: u64 = client_id.downcast::<PyInt>().unwrap().extract().unwrap();
-        let doc = _Doc::with_client_id(id);
-        Doc { doc }
     }
 
     fn guid(&mut self) -> String {
@@ -95,21 +112,22 @@ impl Doc {
         Err(PyRuntimeError::new_err("Already in a transaction"))
     }
 
-    fn get_state(&mut self) -> PyObject {
-        let txn = self.doc.transact_mut();
-        let state = txn.state_vector().encode_v1();
-        drop(txn);
-        Python::with_gil(|py| PyBytes::new(py, &state).into())
+    fn get_state<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        let state = py.allow_threads(|| {
+            let txn = self.doc.transact();
+            txn.state_vector().encode_v1()
+        });
+        PyBytes::new(py, &state)
     }
 
-    fn get_update(&mut self, state: &Bound<'_, PyBytes>) -> PyResult<PyObject> {
-        let txn = self.doc.transact_mut();
+    fn get_update<'py>(&self, py: Python<'py>, state: &Bound<'_, PyBytes>) -> PyResult<Bound<'py, PyBytes>> {
         let state: &[u8] = state.extract()?;
         let Ok(state_vector) = StateVector::decode_v1(&state) else { return Err(PyValueError::new_err("Cannot decode state")) };
-        let update = txn.encode_diff_v1(&state_vector);
-        drop(txn);
-        let bytes: PyObject = Python::with_gil(|py| PyBytes::new(py, &update).into());
-        Ok(bytes)
+        let update = py.allow_threads(|| {
+            let txn = self.doc.transact();
+            txn.encode_diff_v1(&state_vector)
+        });
+        Ok(PyBytes::new(py, &update))
     }
 
     fn apply_update(&mut self, txn: &mut Transaction, update: &Bound<'_, PyBytes>) -> PyResult<()> {
@@ -136,8 +154,14 @@ impl Doc {
             .observe_transaction_cleanup(move |txn, event| {
                 if !event.delete_set.is_empty() || event.before_state != event.after_state {
                     Python::with_gil(|py| {
-                        let event = TransactionEvent::new(py, event, txn);
-                        if let Err(err) = f.call1(py, (event,)) {
+                        let event = Bound::new(py, TransactionEvent::new(py, event, txn)).unwrap();
+                        let result = f.call1(py, (&event,));
+                        // the transaction is freed once committed, so if the callback kept the
+                        // event, read its changed types while the transaction is still alive
+                        if event.get_refcnt() > 1 {
+                            event.borrow_mut().changed(py);
+                        }
+                        if let Err(err) = result {
                             err.restore(py)
                         }
                     })
@@ -172,6 +196,7 @@ pub struct TransactionEvent {
     after_state: Option<Py<PyBytes>>,
     delete_set: Option<Py<PyBytes>>,
     update: Option<Py<PyBytes>>,
+    changed: Option<PyObject>,
     transaction: Option<PyObject>,
 }
 
@@ -186,6 +211,7 @@ impl TransactionEvent {
             after_state: None,
             delete_set: None,
             update: None,
+            changed: None,
             transaction: None,
         };
         transaction_event.update(py);
@@ -260,6 +286,126 @@ impl TransactionEvent {
             update
         }
     }
+
+    #[getter]
+    pub fn changed<'py>(&mut self, py: Python<'py>) -> Bound<'py, PyAny> {
+        if let Some(changed) = &self.changed {
+            changed.clone_ref(py).into_bound(py)
+        } else {
+            let changed = changed_roots(py, self.event(), self.txn()).into_any();
+            self.changed = Some(changed.clone().unbind());
+            changed
+        }
+    }
+}
+
+/// Maps the name of every root type changed in the transaction to the set of its
+/// top-level keys or indices that changed: the keys set or removed and the indices at which
+/// content was inserted or removed in the root type itself, and the keys or indices under
+/// which a nested shared type changed, using the changed parent types collected by yrs while
+/// committing the transaction.
+fn changed_roots<'py>(
+    py: Python<'py>,
+    event: &TransactionCleanupEvent,
+    txn: &TransactionMut,
+) -> Bound<'py, PyDict> {
+    let result = PyDict::new(py);
+    let offset_kind = txn.doc().options().offset_kind.clone();
+    for branch in txn.changed_parent_types() {
+        let mut root: BranchPtr = *branch;
+        while let Some(item) = root.item {
+            if let TypePtr::Branch(parent) = &item.parent {
+                root = *parent;
+            } else {
+                break;
+            }
+        }
+        let BranchID::Root(name) = root.id() else { continue };
+        let keys = match result.get_item(name.as_ref()).unwrap() {
+            Some(keys) => keys.downcast_into::<PySet>().unwrap(),
+            None => {
+                let keys = PySet::empty(py).unwrap();
+                result.set_item(name.as_ref(), &keys).unwrap();
+                keys
+            }
+        };
+        if root == *branch {
+            add_direct_changes(&keys, root, event, &offset_kind);
+        } else {
+            match Branch::path(root, *branch).pop_front() {
+                Some(PathSegment::Key(key)) => keys.add(key.as_ref()).unwrap(),
+                Some(PathSegment::Index(index)) => keys.add(index).unwrap(),
+                None => (),
+            }
+        }
+    }
+    result
+}
+
+/// Adds the keys set or removed in a root type by the transaction, and the indices at which
+/// content was inserted or removed, found from the items created or deleted by the
+/// transaction.
+fn add_direct_changes(
+    keys: &Bound<'_, PySet>,
+    root: BranchPtr,
+    event: &TransactionCleanupEvent,
+    offset_kind: &OffsetKind,
+) {
+    // the clock offset of the first unit created by the transaction in an item, if any
+    // (an item created by the transaction may have been merged with an older one)
+    let created = |item: &Item| {
+        let start = event.before_state.get(&item.id.client);
+        (item.id.clock + item.len() > start).then(|| start.saturating_sub(item.id.clock))
+    };
+    let removed = |item: &Item| {
+        let last = ID::new(item.id.client, item.id.clock + item.len() - 1);
+        item.is_deleted()
+            && (event.delete_set.is_deleted(&item.id) || event.delete_set.is_deleted(&last))
+    };
+    for (key, item) in root.map.iter() {
+        if created(item).is_some() || removed(item) {
+            keys.add(key.as_ref()).unwrap();
+        }
+    }
+    let mut index = 0;
+    let mut current = root.start;
+    while let Some(item) = current {
+        if item.is_countable() {
+            if item.is_deleted() {
+                if created(&item).is_none() && removed(&item) {
+                    keys.add(index).unwrap();
+                }
+            } else {
+                if let Some(offset) = created(&item) {
+                    keys.add(index + clock_offset_len(&item.content, offset, offset_kind)).unwrap();
+                }
+                index += item.content.len(offset_kind.clone());
+            }
+        }
+        current = item.right;
+    }
+}
+
+/// The length of the first `offset` clock units of an item content, in the given offset kind.
+fn clock_offset_len(content: &ItemContent, offset: u32, offset_kind: &OffsetKind) -> u32 {
+    match content {
+        ItemContent::String(chunk) if offset > 0 => {
+            let mut units = 0;
+            let mut len = 0;
+            for c in chunk.as_str().chars() {
+                if units >= offset {
+                    break;
+                }
+                units += c.len_utf16() as u32;
+                len += match offset_kind {
+                    OffsetKind::Utf16 => c.len_utf16() as u32,
+                    _ => c.len_utf8() as u32,
+                };
+            }
+            len
+        }
+        _ => offset,
+    }
 }
 
 #[pyclass(unsendable)]
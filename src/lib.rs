@@ -3,10 +3,12 @@ use xml::XmlElement;
 use xml::XmlEvent;
 use xml::XmlFragment;
 use xml::XmlText;
+mod awareness;
 mod doc;
 mod text;
 mod array;
 mod map;
+mod sticky_index;
 mod transaction;
 mod subscription;
 mod type_conversions;
@@ -16,13 +18,15 @@ mod xml;
 use crate::doc::Doc;
 use crate::doc::TransactionEvent;
 use crate::doc::SubdocsEvent;
-use crate::text::{Text, TextEvent};
+use crate::text::{DiffIterator, Text, TextEvent};
 use crate::array::{Array, ArrayEvent};
 use crate::map::{Map, MapEvent};
+use crate::sticky_index::StickyIndex;
 use crate::transaction::Transaction;
 use crate::subscription::Subscription;
 use crate::undo::{StackItem, UndoManager};
 use crate::update::{get_state, get_update, merge_updates};
+use crate::awareness::{decode_awareness_update, encode_awareness_update};
 
 #[pymodule]
 fn _pycrdt(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
@@ -31,12 +35,14 @@ fn _pycrdt(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_class::<SubdocsEvent>()?;
     m.add_class::<Text>()?;
     m.add_class::<TextEvent>()?;
+    m.add_class::<DiffIterator>()?;
     m.add_class::<Array>()?;
     m.add_class::<ArrayEvent>()?;
     m.add_class::<Map>()?;
     m.add_class::<MapEvent>()?;
     m.add_class::<Transaction>()?;
     m.add_class::<StackItem>()?;
+    m.add_class::<StickyIndex>()?;
     m.add_class::<Subscription>()?;
     m.add_class::<UndoManager>()?;
     m.add_class::<XmlElement>()?;
@@ -46,5 +52,7 @@ fn _pycrdt(_py: Python, m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(get_state, m)?)?;
     m.add_function(wrap_pyfunction!(get_update, m)?)?;
     m.add_function(wrap_pyfunction!(merge_updates, m)?)?;
+    m.add_function(wrap_pyfunction!(encode_awareness_update, m)?)?;
+    m.add_function(wrap_pyfunction!(decode_awareness_update, m)?)?;
     Ok(())
 }
@@ -132,13 +132,14 @@ impl Map {
         PyList::new(py, v).unwrap()
     }
 
-    fn to_json(&mut self, txn: &mut Transaction) -> PyObject {
-        let mut t0 = txn.transaction();
-        let t1 = t0.as_mut().unwrap();
-        let t = t1.as_ref();
-        let mut s = String::new();
-        self.map.to_json(t).to_json(&mut s);
-        Python::with_gil(|py| PyString::new(py, s.as_str()).into())
+    fn to_json<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Bound<'py, PyString> {
+        let map = &self.map;
+        let s = txn.read_without_gil(py, |t| {
+            let mut s = String::new();
+            map.to_json(t).to_json(&mut s);
+            s
+        });
+        PyString::new(py, s.as_str())
     }
 
     pub fn observe(&mut self, py: Python<'_>, f: PyObject) -> PyResult<Py<Subscription>> {
@@ -0,0 +1,58 @@
+use pyo3::prelude::*;
+use pyo3::exceptions::PyValueError;
+use pyo3::types::PyBytes;
+use yrs::{Assoc, StickyIndex as _StickyIndex};
+use yrs::updates::decoder::Decode;
+use yrs::updates::encoder::Encode;
+use crate::transaction::Transaction;
+
+/// Converts an association given as an integer, like in Yjs: a negative value associates with
+/// the item before the index, any other value with the item after it.
+pub(crate) fn assoc_from(assoc: i32) -> Assoc {
+    if assoc < 0 {
+        Assoc::Before
+    } else {
+        Assoc::After
+    }
+}
+
+#[pyclass(frozen)]
+pub struct StickyIndex {
+    sticky_index: _StickyIndex,
+}
+
+impl From<_StickyIndex> for StickyIndex {
+    fn from(sticky_index: _StickyIndex) -> Self {
+        StickyIndex { sticky_index }
+    }
+}
+
+#[pymethods]
+impl StickyIndex {
+    #[staticmethod]
+    fn decode(data: &[u8]) -> PyResult<Self> {
+        let Ok(sticky_index) = _StickyIndex::decode_v1(data) else {
+            return Err(PyValueError::new_err("Cannot decode sticky index"));
+        };
+        Ok(sticky_index.into())
+    }
+
+    fn encode<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        PyBytes::new(py, &self.sticky_index.encode_v1())
+    }
+
+    fn get_offset(&self, txn: &mut Transaction) -> Option<u32> {
+        let mut t0 = txn.transaction();
+        let t1 = t0.as_mut().unwrap();
+        let t = t1.as_ref();
+        self.sticky_index.get_offset(t).map(|offset| offset.index)
+    }
+
+    #[getter]
+    fn assoc(&self) -> i32 {
+        match self.sticky_index.assoc {
+            Assoc::Before => -1,
+            Assoc::After => 0,
+        }
+    }
+}
@@ -1,15 +1,26 @@
 use pyo3::prelude::*;
+use std::sync::Arc;
 use pyo3::IntoPyObjectExt;
+use pyo3::exceptions::{PyIndexError, PyTypeError, PyValueError};
+use pyo3::intern;
 use pyo3::types::{PyDict, PyIterator, PyList, PyString, PyTuple};
 use yrs::{
+    Any,
     GetString,
+    IndexedSequence,
     Observable,
+    OffsetKind,
+    Out,
     TextRef,
     Text as _Text,
     TransactionMut,
 };
-use yrs::types::text::{TextEvent as _TextEvent, YChange};
+use yrs::block::ItemContent;
+use yrs::branch::Branch;
+use yrs::types::Attrs;
+use yrs::types::text::{Diff, TextEvent as _TextEvent, YChange};
 use crate::transaction::Transaction;
+use crate::sticky_index::{assoc_from, StickyIndex};
 use crate::subscription::Subscription;
 use crate::type_conversions::{py_to_any, py_to_attrs, ToPython};
 
@@ -79,40 +90,72 @@ impl Text {
         Ok(())
     }
 
-    fn get_string<'py>(&mut self, py: Python<'py>, txn: &mut Transaction) -> Bound<'py, PyString> {
+    fn get_string<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Bound<'py, PyString> {
+        let text = &self.text;
+        let s = txn.read_without_gil(py, |t| text.get_string(t));
+        PyString::new(py, &s)
+    }
+
+    fn sticky_index(&self, txn: &mut Transaction, index: u32, assoc: i32) -> Option<StickyIndex> {
+        let mut _t = txn.transaction();
+        let t = _t.as_mut().unwrap().as_mut();
+        self.text.sticky_index(t, index, assoc_from(assoc)).map(StickyIndex::from)
+    }
+
+    fn apply_delta(&self, txn: &mut Transaction, delta: &Bound<'_, PyList>) -> PyResult<()> {
+        let mut _t = txn.transaction();
+        let t = _t.as_mut().unwrap().as_mut();
+        apply_delta(t, &self.text, delta)
+    }
+
+    fn set_from(&self, txn: &mut Transaction, value: &str) -> PyResult<()> {
+        let mut _t = txn.transaction();
+        let t = _t.as_mut().unwrap().as_mut();
+        let offset_kind = t.doc().options().offset_kind.clone();
+        let current = self.text.get_string(&*t);
+        if self.text.len(&*t) != offset_len(&current, &offset_kind) {
+            return Err(PyValueError::new_err("Cannot set a text with embeds from a string"));
+        }
+        for (index, len, chunk) in minimal_edits(&current, value, &offset_kind).into_iter().rev() {
+            if len > 0 {
+                self.text.remove_range(t, index, len);
+            }
+            if !chunk.is_empty() {
+                self.text.insert(t, index, &chunk);
+            }
+        }
+        Ok(())
+    }
+
+    fn convert_indexes(
+        &self,
+        txn: &mut Transaction,
+        indexes: Vec<u32>,
+        source: &str,
+        target: &str,
+    ) -> PyResult<Vec<u32>> {
+        let source = IndexKind::parse(source)?;
+        let target = IndexKind::parse(target)?;
+        // the blocks of the text are read while the transaction is held
+        let _t = txn.transaction();
+        convert_indexes(self.text.as_ref(), &indexes, source, target)
+            .ok_or_else(|| PyIndexError::new_err("Index out of range"))
+    }
+
+    #[pyo3(signature = (txn, start=0, stop=None))]
+    fn diff<'py>(&self, py: Python<'py>, txn: &mut Transaction, start: u32, stop: Option<u32>) -> PyResult<Bound<'py, PyList>> {
         let mut t0 = txn.transaction();
         let t1 = t0.as_mut().unwrap();
         let t = t1.as_ref();
-        let s = self.text.get_string(t);
-        PyString::new(py, &s)
+        DiffChunks::new(py, t, self.text.diff(t, YChange::identity), start, stop)?.into_py_list(py)
     }
 
-    fn diff<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Bound<'py, PyList> {
+    #[pyo3(signature = (txn, start=0, stop=None))]
+    fn iter_diff(&self, py: Python<'_>, txn: &mut Transaction, start: u32, stop: Option<u32>) -> PyResult<DiffIterator> {
         let mut t0 = txn.transaction();
         let t1 = t0.as_mut().unwrap();
         let t = t1.as_ref();
-
-        let iter = self.text.diff(t, YChange::identity)
-            .into_iter()
-            .map(|diff| {
-                let attrs = diff.attributes.map(|attrs| {
-                    let pyattrs = PyDict::new(py);
-                    for (name, value) in attrs.into_iter() {
-                        pyattrs.set_item(
-                            PyString::intern(py, &*name),
-                            value.into_py(py),
-                        ).unwrap();
-                    }
-                    pyattrs.into_any()
-                }).unwrap_or_else(|| py.None().into_bound(py));
-                
-                PyTuple::new(py, [
-                    diff.insert.into_py(py),
-                    attrs,
-                ]).unwrap()
-            });
-
-        PyList::new(py, iter).unwrap()
+        Ok(DiffChunks::new(py, t, self.text.diff(t, YChange::identity), start, stop)?.into())
     }
 
     fn observe(&mut self, py: Python<'_>, f: PyObject) -> PyResult<Py<Subscription>> {
@@ -133,6 +176,404 @@ impl Text {
     }
 }
 
+/// Applies a delta in the format of `TextEvent.delta` to a text.
+pub(crate) fn apply_delta<T: _Text>(txn: &mut TransactionMut, text: &T, delta: &Bound<'_, PyList>) -> PyResult<()> {
+    let py = delta.py();
+    let offset_kind = txn.doc().options().offset_kind.clone();
+    let mut index = 0;
+    let mut len = text.len(&*txn);
+    for op in delta.iter() {
+        let op = op.downcast::<PyDict>()?;
+        let attrs = match op.get_item(intern!(py, "attributes"))? {
+            Some(attrs) if !attrs.is_none() => {
+                Some(py_to_attrs(attrs.downcast::<PyDict>()?.items().into_any().try_iter()?)?)
+            }
+            _ => None,
+        };
+        if let Some(insert) = op.get_item(intern!(py, "insert"))? {
+            // inserts without attributes must not inherit the formatting of the previous chunk
+            let attrs = attrs.unwrap_or_default();
+            let inserted = if let Ok(chunk) = insert.downcast::<PyString>() {
+                let chunk = chunk.to_str()?;
+                text.insert_with_attributes(txn, index, chunk, attrs);
+                offset_len(chunk, &offset_kind)
+            } else {
+                match py_to_any(&insert) {
+                    Any::Undefined => return Err(PyTypeError::new_err("Type not supported")),
+                    embed => { text.insert_embed_with_attributes(txn, index, embed, attrs); }
+                }
+                1
+            };
+            index += inserted;
+            len += inserted;
+        } else if let Some(retain) = op.get_item(intern!(py, "retain"))? {
+            let retain: u32 = retain.extract()?;
+            if index + retain > len {
+                return Err(PyValueError::new_err("Retain past the end of the text"));
+            }
+            if let Some(attrs) = attrs {
+                text.format(txn, index, retain, attrs);
+            }
+            index += retain;
+        } else if let Some(delete) = op.get_item(intern!(py, "delete"))? {
+            let delete: u32 = delete.extract()?;
+            if index + delete > len {
+                return Err(PyValueError::new_err("Delete past the end of the text"));
+            }
+            text.remove_range(txn, index, delete);
+            len -= delete;
+        } else {
+            return Err(PyValueError::new_err("Delta operation has no insert, retain or delete"));
+        }
+    }
+    Ok(())
+}
+
+/// A unit in which text indices can be expressed.
+#[derive(Clone, Copy)]
+enum IndexKind {
+    Bytes,
+    Utf16,
+    CodePoints,
+}
+
+impl IndexKind {
+    fn parse(kind: &str) -> PyResult<Self> {
+        match kind {
+            "bytes" => Ok(IndexKind::Bytes),
+            "utf16" => Ok(IndexKind::Utf16),
+            "codepoints" => Ok(IndexKind::CodePoints),
+            other => Err(PyValueError::new_err(format!("Unsupported offset kind: {other}"))),
+        }
+    }
+
+    fn char_len(self, c: char) -> u32 {
+        match self {
+            IndexKind::Bytes => c.len_utf8() as u32,
+            IndexKind::Utf16 => c.len_utf16() as u32,
+            IndexKind::CodePoints => 1,
+        }
+    }
+}
+
+/// Converts indices in a text from one unit to another, in a single pass over its blocks that
+/// stops at the largest index, without copying the text.
+/// Embeds count as one unit, and indices in the middle of a character are rounded down.
+/// Returns `None` if an index is past the end of the text.
+fn convert_indexes(
+    branch: &Branch,
+    indexes: &[u32],
+    source: IndexKind,
+    target: IndexKind,
+) -> Option<Vec<u32>> {
+    let mut order: Vec<usize> = (0..indexes.len()).collect();
+    order.sort_unstable_by_key(|&i| indexes[i]);
+    let mut order = order.into_iter().peekable();
+    let mut converted = vec![0; indexes.len()];
+    let mut position = 0;
+    let mut result = 0;
+    // returns `true` once all the indices are converted
+    let mut step = |len: u32, target_len: u32| {
+        while let Some(&i) = order.peek() {
+            if indexes[i] >= position + len {
+                break;
+            }
+            converted[i] = result;
+            order.next();
+        }
+        position += len;
+        result += target_len;
+        order.peek().is_none()
+    };
+    let mut item = if indexes.is_empty() { None } else { branch.start };
+    'items: while let Some(ptr) = item {
+        if !ptr.is_deleted() && ptr.is_countable() {
+            match &ptr.content {
+                ItemContent::String(chunk) => {
+                    for c in chunk.as_str().chars() {
+                        if step(source.char_len(c), target.char_len(c)) {
+                            break 'items;
+                        }
+                    }
+                }
+                _ => {
+                    if step(1, 1) {
+                        break 'items;
+                    }
+                }
+            }
+        }
+        item = ptr.right;
+    }
+    for i in order {
+        if indexes[i] > position {
+            return None;
+        }
+        converted[i] = result;
+    }
+    Some(converted)
+}
+
+/// Above this number of single-character edits, the changed window is replaced as a whole.
+const MAX_EDIT_DISTANCE: usize = 1000;
+
+/// Computes the edits turning `old` into `new`, as `(index, removed length, inserted string)`
+/// tuples in document order, with indices and lengths in the given offset kind.
+/// The common prefix and suffix are trimmed, then the remaining window is diffed character by
+/// character with Myers' algorithm.
+fn minimal_edits(old: &str, new: &str, offset_kind: &OffsetKind) -> Vec<(u32, u32, String)> {
+    let old: Vec<char> = old.chars().collect();
+    let new: Vec<char> = new.chars().collect();
+    let prefix = old.iter().zip(new.iter()).take_while(|(a, b)| a == b).count();
+    let suffix = old[prefix..].iter().rev()
+        .zip(new[prefix..].iter().rev())
+        .take_while(|(a, b)| a == b)
+        .count();
+    let a = &old[prefix..old.len() - suffix];
+    let b = &new[prefix..new.len() - suffix];
+    if a.is_empty() && b.is_empty() {
+        return Vec::new();
+    }
+    // offsets of the characters of the old window, in the offset kind
+    let base = old[..prefix].iter().map(|c| char_len(*c, offset_kind)).sum::<u32>();
+    let mut offsets = Vec::with_capacity(a.len() + 1);
+    offsets.push(base);
+    for c in a {
+        offsets.push(offsets[offsets.len() - 1] + char_len(*c, offset_kind));
+    }
+    let hunks = myers_diff(a, b, MAX_EDIT_DISTANCE).unwrap_or_else(|| vec![(0, a.len(), 0, b.len())]);
+    hunks.into_iter().map(|(a_start, removed, b_start, inserted)| {
+        (
+            offsets[a_start],
+            offsets[a_start + removed] - offsets[a_start],
+            b[b_start..b_start + inserted].iter().collect(),
+        )
+    }).collect()
+}
+
+fn char_len(c: char, offset_kind: &OffsetKind) -> u32 {
+    match offset_kind {
+        OffsetKind::Utf16 => c.len_utf16() as u32,
+        _ => c.len_utf8() as u32,
+    }
+}
+
+/// Myers' shortest edit script between `a` and `b`, as `(a start, removed, b start, inserted)`
+/// hunks in document order, or `None` if more than `max_d` edits are needed.
+fn myers_diff(a: &[char], b: &[char], max_d: usize) -> Option<Vec<(usize, usize, usize, usize)>> {
+    let n = a.len() as isize;
+    let m = b.len() as isize;
+    let max = (n + m).min(max_d as isize);
+    let offset = max + 1;
+    let mut v = vec![0isize; (2 * max + 3) as usize];
+    let mut trace = Vec::new();
+    let mut end = None;
+    'outer: for d in 0..=max {
+        trace.push(v.clone());
+        for k in (-d..=d).step_by(2) {
+            let i = (k + offset) as usize;
+            let mut x = if k == -d || (k != d && v[i - 1] < v[i + 1]) { v[i + 1] } else { v[i - 1] + 1 };
+            let mut y = x - k;
+            while x < n && y < m && a[x as usize] == b[y as usize] {
+                x += 1;
+                y += 1;
+            }
+            v[i] = x;
+            if x >= n && y >= m {
+                end = Some(d);
+                break 'outer;
+            }
+        }
+    }
+    let end = end?;
+    // walk back from the end, collecting single-character edits as (a position, b position, is insertion)
+    let (mut x, mut y) = (n, m);
+    let mut edits = Vec::with_capacity(end as usize);
+    for d in (1..=end).rev() {
+        let v = &trace[d as usize];
+        let k = x - y;
+        let i = (k + offset) as usize;
+        let prev_k = if k == -d || (k != d && v[i - 1] < v[i + 1]) { k + 1 } else { k - 1 };
+        let prev_x = v[(prev_k + offset) as usize];
+        let prev_y = prev_x - prev_k;
+        while x > prev_x && y > prev_y {
+            x -= 1;
+            y -= 1;
+        }
+        edits.push((prev_x as usize, prev_y as usize, x == prev_x));
+        x = prev_x;
+        y = prev_y;
+    }
+    // merge contiguous edits into hunks
+    let mut hunks: Vec<(usize, usize, usize, usize)> = Vec::new();
+    for (x, y, insertion) in edits.into_iter().rev() {
+        match hunks.last_mut() {
+            Some((a_start, removed, b_start, inserted)) if *a_start + *removed == x && *b_start + *inserted == y => {
+                if insertion { *inserted += 1 } else { *removed += 1 }
+            }
+            _ => hunks.push(if insertion { (x, 0, y, 1) } else { (x, 1, y, 0) }),
+        }
+    }
+    Some(hunks)
+}
+
+/// Converts the formatted chunks of a text to Python `(content, attributes)` tuples.
+/// Only the chunks in the `[start, stop)` range are converted, cut at the range boundaries.
+pub(crate) struct DiffChunks {
+    chunks: std::vec::IntoIter<(ChunkInsert, Option<Box<Attrs>>)>,
+    offset_kind: OffsetKind,
+    position: u32,
+    start: u32,
+    stop: Option<u32>,
+}
+
+/// The content of a chunk: a string, or an embed converted to Python while the transaction
+/// is alive, since it may be a shared type that a later transaction deletes.
+enum ChunkInsert {
+    String(Arc<str>),
+    Embed(PyObject),
+}
+
+impl DiffChunks {
+    pub fn new(
+        py: Python<'_>,
+        txn: &TransactionMut,
+        diff: Vec<Diff<YChange>>,
+        start: u32,
+        stop: Option<u32>,
+    ) -> PyResult<Self> {
+        if stop.is_some_and(|stop| stop < start) {
+            return Err(PyValueError::new_err("Stop index must not be smaller than start index"));
+        }
+        let chunks: Vec<_> = diff.into_iter().map(|diff| {
+            let insert = match diff.insert {
+                Out::Any(Any::String(chunk)) => ChunkInsert::String(chunk),
+                insert => ChunkInsert::Embed(insert.into_py(py).unbind()),
+            };
+            (insert, diff.attributes)
+        }).collect();
+        Ok(DiffChunks {
+            chunks: chunks.into_iter(),
+            offset_kind: txn.doc().options().offset_kind.clone(),
+            position: 0,
+            start,
+            stop,
+        })
+    }
+
+    pub fn into_py_list<'py>(mut self, py: Python<'py>) -> PyResult<Bound<'py, PyList>> {
+        let mut chunks = Vec::new();
+        while let Some(chunk) = self.next_chunk(py)? {
+            chunks.push(chunk);
+        }
+        PyList::new(py, chunks)
+    }
+
+    fn next_chunk<'py>(&mut self, py: Python<'py>) -> PyResult<Option<Bound<'py, PyTuple>>> {
+        loop {
+            if self.stop.is_some_and(|stop| self.position >= stop) {
+                return Ok(None);
+            }
+            let Some((insert, attributes)) = self.chunks.next() else {
+                return Ok(None);
+            };
+            let chunk_start = self.position;
+            let insert = match insert {
+                ChunkInsert::String(chunk) => {
+                    let len = offset_len(&chunk, &self.offset_kind);
+                    self.position += len;
+                    if self.position <= self.start {
+                        continue;
+                    }
+                    let from = self.start.saturating_sub(chunk_start);
+                    let to = self.stop.map_or(len, |stop| len.min(stop - chunk_start));
+                    if from == 0 && to == len {
+                        PyString::new(py, &chunk).into_any()
+                    } else {
+                        let from = byte_offset(&chunk, from, &self.offset_kind)?;
+                        let to = byte_offset(&chunk, to, &self.offset_kind)?;
+                        PyString::new(py, &chunk[from..to]).into_any()
+                    }
+                }
+                ChunkInsert::Embed(embed) => {
+                    // embeds have a length of 1
+                    self.position += 1;
+                    if self.position <= self.start {
+                        continue;
+                    }
+                    embed.into_bound(py)
+                }
+            };
+            let attrs = match attributes {
+                Some(attrs) => (&*attrs).into_py(py),
+                None => py.None().into_bound(py),
+            };
+            return Ok(Some(PyTuple::new(py, [insert, attrs])?));
+        }
+    }
+}
+
+/// The length of a string, in the given offset kind.
+fn offset_len(s: &str, offset_kind: &OffsetKind) -> u32 {
+    match offset_kind {
+        OffsetKind::Utf16 => s.encode_utf16().count() as u32,
+        _ => s.len() as u32,
+    }
+}
+
+/// Converts an offset in the given offset kind to a byte offset, failing if the offset falls
+/// inside a character.
+fn byte_offset(s: &str, offset: u32, offset_kind: &OffsetKind) -> PyResult<usize> {
+    let index = match offset_kind {
+        OffsetKind::Utf16 => {
+            let mut units = 0;
+            let mut found = None;
+            for (index, c) in s.char_indices() {
+                if units >= offset {
+                    found = Some((index, units));
+                    break;
+                }
+                units += c.len_utf16() as u32;
+            }
+            match found {
+                Some((index, units)) if units == offset => Some(index),
+                Some(_) => None,
+                None => (units == offset).then_some(s.len()),
+            }
+        }
+        _ => {
+            let index = (offset as usize).min(s.len());
+            s.is_char_boundary(index).then_some(index)
+        }
+    };
+    index.ok_or_else(|| PyValueError::new_err("Index falls inside a character"))
+}
+
+/// An iterator converting the formatted chunks of a text to Python one at a time (see
+/// `DiffChunks`). The chunks themselves are all computed when the iterator is created, and
+/// their embeds converted, so that iterating does not need the transaction.
+#[pyclass(unsendable)]
+pub struct DiffIterator {
+    chunks: DiffChunks,
+}
+
+impl From<DiffChunks> for DiffIterator {
+    fn from(chunks: DiffChunks) -> Self {
+        DiffIterator { chunks }
+    }
+}
+
+#[pymethods]
+impl DiffIterator {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__<'py>(&mut self, py: Python<'py>) -> PyResult<Option<Bound<'py, PyTuple>>> {
+        self.chunks.next_chunk(py)
+    }
+}
+
 #[pyclass(unsendable)]
 pub struct TextEvent {
     event: *const _TextEvent,
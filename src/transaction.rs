@@ -48,8 +48,30 @@ impl Transaction {
     pub fn transaction(&self) -> RefMut<'_, Option<Cell<'static, TransactionMut<'static>>>> {
         self.0.borrow_mut()
     }
+
+    /// Runs a read-only closure on the transaction with the GIL released, so that other
+    /// Python threads can make progress during long reads.
+    pub fn read_without_gil<F, R>(&self, py: Python<'_>, f: F) -> R
+    where
+        F: FnOnce(&TransactionMut<'static>) -> R + Send,
+        R: Send,
+    {
+        let mut t0 = self.transaction();
+        let t = TransactionRef(t0.as_mut().unwrap().as_ref());
+        py.allow_threads(move || {
+            let t = t;
+            f(t.0)
+        })
+    }
 }
 
+/// A transaction reference that can be moved into a closure running without the GIL.
+/// The transaction class is unsendable, so the reference never leaves the thread that
+/// owns the transaction.
+struct TransactionRef<'a>(&'a TransactionMut<'static>);
+
+unsafe impl Send for TransactionRef<'_> {}
+
 #[pymethods]
 impl Transaction {
     pub fn commit(&mut self) {
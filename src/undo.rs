@@ -1,20 +1,25 @@
 use std::collections::HashSet;
 use std::sync::Arc;
+use std::sync::atomic::{AtomicBool, Ordering};
+use std::time::Instant;
 use pyo3::prelude::*;
-use pyo3::types::PyList;
+use pyo3::types::{PyBytes, PyList};
 use pyo3::exceptions::PyRuntimeError;
 use yrs::{
-    UndoManager as _UndoManager,
+    Out, ReadTxn, TransactionMut, UndoManager as _UndoManager,
 };
 use yrs::undo::{
     Options,
     StackItem as _StackItem,
 };
 use yrs::sync::{Clock, Timestamp};
+use yrs::updates::encoder::Encode;
 use crate::doc::Doc;
 use crate::text::Text;
 use crate::array::Array;
 use crate::map::Map;
+use crate::transaction::Transaction;
+use crate::xml::{XmlElement, XmlFragment, XmlText};
 
 struct PythonClock {
     timestamp: PyObject,
@@ -28,24 +33,52 @@ impl Clock for PythonClock {
     }
 }
 
+struct MonotonicClock {
+    start: Instant,
+}
+
+impl Clock for MonotonicClock {
+    fn now(&self) -> Timestamp {
+        self.start.elapsed().as_millis() as Timestamp
+    }
+}
+
 #[pyclass(unsendable)]
 pub struct UndoManager {
     undo_manager: _UndoManager,
+    capturing: Arc<AtomicBool>,
 }
 
 #[pymethods]
 impl UndoManager {
     #[new]
-    fn new(doc: &Doc, capture_timeout_millis: u64, timestamp: PyObject) -> Self {
+    #[pyo3(signature = (doc, capture_timeout_millis, timestamp=None))]
+    fn new(doc: &Doc, capture_timeout_millis: u64, timestamp: Option<PyObject>) -> Self {
+        // only call into Python when a custom timestamp callable is given
+        let timestamp: Arc<dyn Clock> = match timestamp {
+            Some(timestamp) => Arc::new(PythonClock {timestamp}),
+            None => Arc::new(MonotonicClock {start: Instant::now()}),
+        };
         let mut options = Options {
             capture_timeout_millis: 500,
             tracked_origins: HashSet::new(),
             capture_transaction: None,
-            timestamp: Arc::new(PythonClock {timestamp}),
+            timestamp,
         };
         options.capture_timeout_millis = capture_timeout_millis;
+        // changes are only captured while capturing is on, so that older generations of
+        // a bounded undo history stop recording
+        let capturing = Arc::new(AtomicBool::new(true));
+        let flag = capturing.clone();
+        let capture_transaction: Arc<dyn Fn(&TransactionMut) -> bool + Send + Sync> =
+            Arc::new(move |_txn: &TransactionMut| flag.load(Ordering::Relaxed));
+        options.capture_transaction = Some(capture_transaction);
         let undo_manager = _UndoManager::with_options(&doc.doc, options);
-        UndoManager { undo_manager }
+        UndoManager { undo_manager, capturing }
+    }
+
+    pub fn set_capturing(&self, capturing: bool) {
+        self.capturing.store(capturing, Ordering::Relaxed);
     }
 
     pub fn expand_scope_text(&mut self, scope: &Text) {
@@ -60,6 +93,36 @@ impl UndoManager {
         self.undo_manager.expand_scope(&scope.map);
     }
 
+    pub fn expand_scope_xmlfragment(&mut self, scope: &XmlFragment) {
+        self.undo_manager.expand_scope(&scope.fragment);
+    }
+
+    pub fn expand_scope_xmlelement(&mut self, scope: &XmlElement) {
+        self.undo_manager.expand_scope(&scope.element);
+    }
+
+    pub fn expand_scope_xmltext(&mut self, scope: &XmlText) {
+        self.undo_manager.expand_scope(&scope.text);
+    }
+
+    pub fn expand_scope_roots(&mut self, txn: &mut Transaction) {
+        let mut t0 = txn.transaction();
+        let t1 = t0.as_mut().unwrap();
+        let t = t1.as_ref();
+        for (_, root) in t.root_refs() {
+            match root {
+                Out::YText(v) => self.undo_manager.expand_scope(&v),
+                Out::YArray(v) => self.undo_manager.expand_scope(&v),
+                Out::YMap(v) => self.undo_manager.expand_scope(&v),
+                Out::YXmlFragment(v) => self.undo_manager.expand_scope(&v),
+                Out::YXmlElement(v) => self.undo_manager.expand_scope(&v),
+                Out::YXmlText(v) => self.undo_manager.expand_scope(&v),
+                Out::UndefinedRef(v) => self.undo_manager.expand_scope(&v),
+                _ => (),
+            }
+        }
+    }
+
     pub fn include_origin(&mut self, origin: i128) {
         self.undo_manager.include_origin(origin);
     }
@@ -113,6 +176,34 @@ impl UndoManager {
         let res = PyList::new(py, elements);
         res.unwrap()
     }
+
+    pub fn undo_stack_len(&self) -> usize {
+        self.undo_manager.undo_stack().len()
+    }
+
+    pub fn redo_stack_len(&self) -> usize {
+        self.undo_manager.redo_stack().len()
+    }
+
+    pub fn undo_item_size(&self, index: usize) -> Option<usize> {
+        self.undo_manager.undo_stack().get(index).map(item_size)
+    }
+
+    pub fn memory_usage(&self) -> (usize, usize) {
+        (
+            stack_size(self.undo_manager.undo_stack()),
+            stack_size(self.undo_manager.redo_stack()),
+        )
+    }
+}
+
+fn stack_size(stack: &[_StackItem<()>]) -> usize {
+    // size of the encoded ID sets, which is what stack items retain
+    stack.iter().map(item_size).sum()
+}
+
+fn item_size(item: &_StackItem<()>) -> usize {
+    item.insertions().encode_v1().len() + item.deletions().encode_v1().len()
 }
 
 
@@ -133,4 +224,19 @@ impl StackItem {
     fn __repr__(&self) -> String {
         format!("{0}", self.stack_item)
     }
+
+    #[getter]
+    fn insertions<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        PyBytes::new(py, &self.stack_item.insertions().encode_v1())
+    }
+
+    #[getter]
+    fn deletions<'py>(&self, py: Python<'py>) -> Bound<'py, PyBytes> {
+        PyBytes::new(py, &self.stack_item.deletions().encode_v1())
+    }
+
+    #[getter]
+    fn size(&self) -> usize {
+        item_size(&self.stack_item)
+    }
 }
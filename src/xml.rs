@@ -1,14 +1,23 @@
 use pyo3::prelude::*;
+use pyo3::exceptions::{PyTypeError, PyValueError};
 use pyo3::IntoPyObjectExt;
-use pyo3::types::{PyBool, PyDict, PyIterator, PyList, PyString, PyTuple};
-use pyo3::{pyclass, pymethods, Bound, PyAny, PyObject, PyResult, Python};
-use yrs::types::text::YChange;
+use pyo3::types::{PyBool, PyDict, PyIterator, PyList, PyString};
+use pyo3::{intern, pyclass, pymethods, Bound, PyAny, PyObject, PyResult, Python};
+use yrs::branch::{Branch, BranchPtr};
+use yrs::types::Attrs;
+use yrs::types::array::ArrayPrelim;
+use yrs::types::map::MapPrelim;
+use yrs::types::text::{TextPrelim, YChange};
 use yrs::types::xml::{XmlEvent as _XmlEvent, XmlTextEvent as _XmlTextEvent};
 use yrs::{
-    DeepObservable, GetString as _, Observable as _, Text as _, TransactionMut, Xml as _, XmlElementPrelim, XmlElementRef, XmlFragment as _, XmlFragmentRef, XmlOut, XmlTextPrelim, XmlTextRef
+    Any, DeepObservable, GetString as _, IndexedSequence as _, Map as _, MapRef, Observable as _, Out, ReadTxn, Text as _, TransactionMut, Xml as _, XmlElementPrelim, XmlElementRef, XmlFragment as _, XmlFragmentRef, XmlOut, XmlTextPrelim, XmlTextRef
 };
 
+use crate::array::Array;
+use crate::map::Map;
+use crate::sticky_index::{assoc_from, StickyIndex};
 use crate::subscription::Subscription;
+use crate::text::{apply_delta, DiffChunks, DiffIterator, Text};
 use crate::type_conversions::{events_into_py, py_to_any, py_to_attrs, EntryChangeWrapper, ToPython};
 use crate::transaction::Transaction;
 
@@ -37,11 +46,9 @@ macro_rules! impl_xml_methods {
                 }
             }
 
-            fn get_string(&self, txn: &mut Transaction) -> String {
-                let mut t0 = txn.transaction();
-                let t1 = t0.as_mut().unwrap();
-                let t = t1.as_ref();
-                self.$inner.get_string(t)
+            fn get_string(&self, py: Python<'_>, txn: &mut Transaction) -> String {
+                let inner = &self.$inner;
+                txn.read_without_gil(py, |t| inner.get_string(t))
             }
 
             fn len(&self, txn: &mut Transaction)  -> u32 {
@@ -59,6 +66,21 @@ macro_rules! impl_xml_methods {
                     self.$finner.get(t, index).unwrap().into_py(py)
                 }
 
+                fn children<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Vec<Bound<'py, PyAny>> {
+                    let mut t0 = txn.transaction();
+                    let t1 = t0.as_mut().unwrap();
+                    let t = t1.as_ref();
+                    self.$finner.children(t).map(|node| node.into_py(py)).collect()
+                }
+
+                fn walk<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Vec<Bound<'py, PyAny>> {
+                    let mut t0 = txn.transaction();
+                    let t1 = t0.as_mut().unwrap();
+                    let t = t1.as_ref();
+                    // depth-first, in document order
+                    self.$finner.successors(t).map(|node| node.into_py(py)).collect()
+                }
+
                 fn remove_range(&self, txn: &mut Transaction, index: u32, len: u32) {
                     let mut _t = txn.transaction();
                     let mut t = _t.as_mut().unwrap().as_mut();
@@ -76,27 +98,99 @@ macro_rules! impl_xml_methods {
                     let mut t = _t.as_mut().unwrap().as_mut();
                     self.$finner.insert(&mut t, index, XmlElementPrelim::empty(tag)).into()
                 }
+
+                fn insert_tree<'py>(&self, py: Python<'py>, txn: &mut Transaction, index: u32, nodes: Bound<'py, PyList>) -> PyResult<Vec<Bound<'py, PyAny>>> {
+                    let mut _t = txn.transaction();
+                    let t = _t.as_mut().unwrap().as_mut();
+                    let inserted = insert_xml_nodes(t, &self.$finner, index, &nodes)?;
+                    Ok(inserted.into_iter().map(|node| node.into_py(py)).collect())
+                }
             )?
 
             $(
-                fn attributes(&self, txn: &mut Transaction) -> Vec<(String, String)> {
+                fn attributes<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Vec<(String, Bound<'py, PyAny>)> {
+                    let mut t0 = txn.transaction();
+                    let t1 = t0.as_mut().unwrap();
+                    let t = t1.as_ref();
+                    attribute_map(self.$xinner.as_ref()).iter(t).map(|(k, v)| (String::from(k), v.into_py(py))).collect()
+                }
+
+                fn attribute<'py>(&self, py: Python<'py>, txn: &mut Transaction, name: &str) -> Option<Bound<'py, PyAny>> {
+                    let mut t0 = txn.transaction();
+                    let t1 = t0.as_mut().unwrap();
+                    let t = t1.as_ref();
+                    attribute_map(self.$xinner.as_ref()).get(t, name).map(|v| v.into_py(py))
+                }
+
+                fn attributes_len(&self, txn: &mut Transaction) -> u32 {
+                    let mut t0 = txn.transaction();
+                    let t1 = t0.as_mut().unwrap();
+                    let t = t1.as_ref();
+                    attribute_map(self.$xinner.as_ref()).len(t)
+                }
+
+                fn attribute_keys(&self, txn: &mut Transaction) -> Vec<String> {
+                    let mut t0 = txn.transaction();
+                    let t1 = t0.as_mut().unwrap();
+                    let t = t1.as_ref();
+                    attribute_map(self.$xinner.as_ref()).keys(t).map(String::from).collect()
+                }
+
+                fn has_attribute(&self, txn: &mut Transaction, name: &str) -> bool {
                     let mut t0 = txn.transaction();
                     let t1 = t0.as_mut().unwrap();
                     let t = t1.as_ref();
-                    self.$xinner.attributes(t).map(|(k,v)| (String::from(k), v)).collect()
+                    attribute_map(self.$xinner.as_ref()).contains_key(t, name)
                 }
 
-                fn attribute(&self, txn: &mut Transaction, name: &str) -> Option<String> {
+                fn get_attributes<'py>(&self, py: Python<'py>, txn: &mut Transaction, names: Vec<String>) -> Vec<Option<Bound<'py, PyAny>>> {
                     let mut t0 = txn.transaction();
                     let t1 = t0.as_mut().unwrap();
                     let t = t1.as_ref();
-                    self.$xinner.get_attribute(t, name)
+                    let map = attribute_map(self.$xinner.as_ref());
+                    names.iter().map(|name| map.get(t, name).map(|v| v.into_py(py))).collect()
+                }
+
+                fn insert_attribute(&self, txn: &mut Transaction, name: &str, value: &Bound<'_, PyAny>) -> PyResult<()> {
+                    let mut _t = txn.transaction();
+                    let mut t = _t.as_mut().unwrap().as_mut();
+                    match py_to_any(value) {
+                        Any::Undefined => Err(PyTypeError::new_err("Type not supported")),
+                        v => {
+                            attribute_map(self.$xinner.as_ref()).insert(&mut t, name, v);
+                            Ok(())
+                        },
+                    }
+                }
+
+                fn insert_attribute_text_prelim(&self, txn: &mut Transaction, name: &str) -> Text {
+                    let mut _t = txn.transaction();
+                    let mut t = _t.as_mut().unwrap().as_mut();
+                    Text::from(attribute_map(self.$xinner.as_ref()).insert(&mut t, name, TextPrelim::new("")))
+                }
+
+                fn insert_attribute_array_prelim(&self, txn: &mut Transaction, name: &str) -> Array {
+                    let mut _t = txn.transaction();
+                    let mut t = _t.as_mut().unwrap().as_mut();
+                    Array::from(attribute_map(self.$xinner.as_ref()).insert(&mut t, name, ArrayPrelim::default()))
                 }
-            
-                fn insert_attribute(&self, txn: &mut Transaction, name: &str, value: &str) {
+
+                fn insert_attribute_map_prelim(&self, txn: &mut Transaction, name: &str) -> Map {
                     let mut _t = txn.transaction();
                     let mut t = _t.as_mut().unwrap().as_mut();
-                    self.$xinner.insert_attribute(&mut t, name, value);
+                    Map::from(attribute_map(self.$xinner.as_ref()).insert(&mut t, name, MapPrelim::default()))
+                }
+
+                fn insert_attribute_xmlfragment_prelim(&self, _txn: &mut Transaction, _name: &str) -> PyResult<PyObject> {
+                    Err(PyTypeError::new_err("Cannot use an XmlFragment as an attribute value"))
+                }
+
+                fn insert_attribute_xmlelement_prelim(&self, _txn: &mut Transaction, _name: &str) -> PyResult<PyObject> {
+                    Err(PyTypeError::new_err("Cannot use an XmlElement as an attribute value"))
+                }
+
+                fn insert_attribute_xmltext_prelim(&self, _txn: &mut Transaction, _name: &str) -> PyResult<PyObject> {
+                    Err(PyTypeError::new_err("Cannot use an XmlText as an attribute value"))
                 }
 
                 fn remove_attribute(&self, txn: &mut Transaction, name: &str) {
@@ -138,6 +232,13 @@ impl From<XmlFragmentRef> for XmlFragment {
 }
 
 impl_xml_methods!(XmlFragment[fragment, fragment: fragment] {
+    fn to_dict<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Bound<'py, PyDict> {
+        let mut t0 = txn.transaction();
+        let t1 = t0.as_mut().unwrap();
+        let t = t1.as_ref();
+        xml_to_dict(py, t, XmlOut::Fragment(self.fragment.clone()))
+    }
+
     fn observe(&self, f: PyObject) -> Subscription {
         self.fragment.observe(move |txn, e| {
             Python::with_gil(|py| {
@@ -174,6 +275,13 @@ impl From<XmlElementRef> for XmlElement {
 }
 
 impl_xml_methods!(XmlElement[element, fragment: element, xml: element] {
+    fn to_dict<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Bound<'py, PyDict> {
+        let mut t0 = txn.transaction();
+        let t1 = t0.as_mut().unwrap();
+        let t = t1.as_ref();
+        xml_to_dict(py, t, XmlOut::Element(self.element.clone()))
+    }
+
     fn tag(&self) -> Option<String> {
         self.element.try_tag().map(|s| String::from(&**s))
     }
@@ -214,6 +322,13 @@ impl From<XmlTextRef> for XmlText {
 }
 
 impl_xml_methods!(XmlText[text, xml: text] {
+    fn to_dict<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Bound<'py, PyDict> {
+        let mut t0 = txn.transaction();
+        let t1 = t0.as_mut().unwrap();
+        let t = t1.as_ref();
+        xml_to_dict(py, t, XmlOut::Text(self.text.clone()))
+    }
+
     #[pyo3(signature = (txn, index, text, attrs=None))]
     fn insert(&self, txn: &mut Transaction, index: u32, text: &str, attrs: Option<Bound<'_, PyIterator>>) -> PyResult<()> {
         let mut _t = txn.transaction();
@@ -255,35 +370,32 @@ impl_xml_methods!(XmlText[text, xml: text] {
         Ok(())
     }
 
-    fn diff<'py>(&self, py: Python<'py>, txn: &mut Transaction) -> Bound<'py, PyList> {
+    fn sticky_index(&self, txn: &mut Transaction, index: u32, assoc: i32) -> Option<StickyIndex> {
+        let mut _t = txn.transaction();
+        let t = _t.as_mut().unwrap().as_mut();
+        self.text.sticky_index(t, index, assoc_from(assoc)).map(StickyIndex::from)
+    }
+
+    fn apply_delta(&self, txn: &mut Transaction, delta: &Bound<'_, PyList>) -> PyResult<()> {
+        let mut _t = txn.transaction();
+        let t = _t.as_mut().unwrap().as_mut();
+        apply_delta(t, &self.text, delta)
+    }
+
+    #[pyo3(signature = (txn, start=0, stop=None))]
+    fn diff<'py>(&self, py: Python<'py>, txn: &mut Transaction, start: u32, stop: Option<u32>) -> PyResult<Bound<'py, PyList>> {
         let mut t0 = txn.transaction();
         let t1 = t0.as_mut().unwrap();
         let t = t1.as_ref();
+        DiffChunks::new(py, t, self.text.diff(t, YChange::identity), start, stop)?.into_py_list(py)
+    }
 
-        let iter = self.text.diff(t, YChange::identity)
-            .into_iter()
-            .map(|diff| {
-                let attrs = diff.attributes.map(|attrs| {
-                    let pyattrs = PyDict::new(py);
-                    for (name, value) in attrs.into_iter() {
-                        pyattrs.set_item(
-                            PyString::intern(py, &*name),
-                            value.into_py(py),
-                        ).unwrap();
-                    }
-                    pyattrs.into_any()
-                }).unwrap_or_else(|| py.None().into_bound(py));
-
-                PyTuple::new(py, [
-                    diff.insert.into_py(py),
-                    attrs,
-                ]).unwrap()
-            });
-
-        PyList::new(
-            py,
-            iter
-        ).unwrap()
+    #[pyo3(signature = (txn, start=0, stop=None))]
+    fn iter_diff(&self, py: Python<'_>, txn: &mut Transaction, start: u32, stop: Option<u32>) -> PyResult<DiffIterator> {
+        let mut t0 = txn.transaction();
+        let t1 = t0.as_mut().unwrap();
+        let t = t1.as_ref();
+        Ok(DiffChunks::new(py, t, self.text.diff(t, YChange::identity), start, stop)?.into())
     }
 
     fn observe(&self, f: PyObject) -> Subscription {
@@ -304,6 +416,123 @@ impl_xml_methods!(XmlText[text, xml: text] {
 
 
 
+/// Returns the attributes of an XML element or text, which are stored in its branch
+/// like the entries of a map, so that they can hold any value.
+fn attribute_map(branch: &Branch) -> MapRef {
+    MapRef::from(BranchPtr::from(branch))
+}
+
+/// Exports an XML node and all its descendants to Python dicts and lists.
+fn xml_to_dict<'py, T: ReadTxn>(py: Python<'py>, txn: &T, node: XmlOut) -> Bound<'py, PyDict> {
+    let result = PyDict::new(py);
+    match node {
+        XmlOut::Element(element) => {
+            let tag = element.try_tag().map(|tag| String::from(&**tag));
+            result.set_item(intern!(py, "tag"), tag).unwrap();
+            let attributes = PyDict::new(py);
+            for (name, value) in attribute_map(element.as_ref()).iter(txn) {
+                attributes.set_item(name, out_to_plain(py, txn, value)).unwrap();
+            }
+            result.set_item(intern!(py, "attributes"), attributes).unwrap();
+            let children = element.children(txn).map(|child| xml_to_dict(py, txn, child));
+            result.set_item(intern!(py, "children"), PyList::new(py, children).unwrap()).unwrap();
+        }
+        XmlOut::Fragment(fragment) => {
+            let children = fragment.children(txn).map(|child| xml_to_dict(py, txn, child));
+            result.set_item(intern!(py, "children"), PyList::new(py, children).unwrap()).unwrap();
+        }
+        XmlOut::Text(text) => {
+            let delta = text.diff(txn, YChange::identity).into_iter().map(|diff| {
+                let chunk = PyDict::new(py);
+                chunk.set_item(intern!(py, "insert"), out_to_plain(py, txn, diff.insert)).unwrap();
+                if let Some(attrs) = diff.attributes {
+                    chunk.set_item(intern!(py, "attributes"), (&*attrs).into_py(py)).unwrap();
+                }
+                chunk
+            });
+            result.set_item(intern!(py, "delta"), PyList::new(py, delta).unwrap()).unwrap();
+        }
+    }
+    result
+}
+
+/// Converts a value to plain Python data, shared types being exported as their JSON value, so
+/// that the result of `xml_to_dict` does not hold native shared types.
+fn out_to_plain<'py, T: ReadTxn>(py: Python<'py>, txn: &T, value: Out) -> Bound<'py, PyAny> {
+    match value {
+        Out::Any(any) => any.into_py(py),
+        value => value.to_json(txn).into_py(py),
+    }
+}
+
+/// Inserts XML nodes given as Python dicts (in the format of `xml_to_dict`) and all their
+/// descendants, returning the inserted nodes.
+fn insert_xml_nodes<P: yrs::XmlFragment>(
+    txn: &mut TransactionMut,
+    parent: &P,
+    index: u32,
+    nodes: &Bound<'_, PyList>,
+) -> PyResult<Vec<XmlOut>> {
+    let mut inserted = Vec::with_capacity(nodes.len());
+    for (i, node) in nodes.iter().enumerate() {
+        let node = node.downcast::<PyDict>()?;
+        inserted.push(insert_xml_node(txn, parent, index + i as u32, node)?);
+    }
+    Ok(inserted)
+}
+
+fn insert_xml_node<P: yrs::XmlFragment>(
+    txn: &mut TransactionMut,
+    parent: &P,
+    index: u32,
+    node: &Bound<'_, PyDict>,
+) -> PyResult<XmlOut> {
+    let py = node.py();
+    if let Some(tag) = node.get_item(intern!(py, "tag"))? {
+        let tag: String = tag.extract()?;
+        let element = parent.insert(txn, index, XmlElementPrelim::empty(tag));
+        if let Some(attributes) = node.get_item(intern!(py, "attributes"))? {
+            let map = attribute_map(element.as_ref());
+            for (name, value) in attributes.downcast::<PyDict>()?.iter() {
+                let name: String = name.extract()?;
+                match py_to_any(&value) {
+                    Any::Undefined => return Err(PyTypeError::new_err("Type not supported")),
+                    value => { map.insert(txn, name, value); }
+                }
+            }
+        }
+        if let Some(children) = node.get_item(intern!(py, "children"))? {
+            insert_xml_nodes(txn, &element, 0, children.downcast::<PyList>()?)?;
+        }
+        Ok(XmlOut::Element(element))
+    } else if let Some(delta) = node.get_item(intern!(py, "delta"))? {
+        let text = parent.insert(txn, index, XmlTextPrelim::new(""));
+        for chunk in delta.downcast::<PyList>()?.iter() {
+            let chunk = chunk.downcast::<PyDict>()?;
+            let Some(insert) = chunk.get_item(intern!(py, "insert"))? else {
+                return Err(PyValueError::new_err("Text chunk has no insert"));
+            };
+            // chunks without attributes must not inherit the formatting of the previous chunk
+            let attrs = match chunk.get_item(intern!(py, "attributes"))? {
+                Some(attrs) => py_to_attrs(attrs.downcast::<PyDict>()?.items().into_any().try_iter()?)?,
+                None => Attrs::new(),
+            };
+            let offset = text.len(&*txn);
+            if let Ok(chunk) = insert.downcast::<PyString>() {
+                text.insert_with_attributes(txn, offset, chunk.to_str()?, attrs);
+            } else {
+                match py_to_any(&insert) {
+                    Any::Undefined => return Err(PyTypeError::new_err("Type not supported")),
+                    embed => { text.insert_embed_with_attributes(txn, offset, embed, attrs); }
+                }
+            }
+        }
+        Ok(XmlOut::Text(text))
+    } else {
+        Err(PyValueError::new_err("XML node has neither a tag nor a delta"))
+    }
+}
+
 #[pyclass(unsendable)]
 pub struct XmlEvent {
     txn: *const TransactionMut<'static>,
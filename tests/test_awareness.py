@@ -6,6 +6,8 @@ import pytest
 from anyio import create_task_group, sleep
 from pycrdt import (
     Awareness,
+    AwarenessRegistry,
+    AwarenessScheduler,
     Doc,
     Encoder,
     YMessageType,
@@ -360,6 +362,24 @@ def test_awareness_encode_wrong_id():
         awareness.encode_awareness_update([10])
 
 
+def test_awareness_serialized_cache():
+    ydoc = Doc()
+    awareness = Awareness(ydoc)
+    awareness.apply_awareness_update(
+        create_awareness_update(REMOTE_CLIENT_ID, REMOTE_USER), "custom_origin"
+    )
+    awareness.encode_awareness_update([REMOTE_CLIENT_ID])
+    assert REMOTE_CLIENT_ID in awareness._serialized
+
+    awareness.remove_awareness_states([REMOTE_CLIENT_ID], "custom_origin")
+    update = awareness.encode_awareness_update([REMOTE_CLIENT_ID])
+    assert update.endswith(b"null")
+    assert REMOTE_CLIENT_ID not in awareness._serialized
+    with pytest.raises(TypeError):
+        awareness.encode_awareness_update([10])
+    assert 10 not in awareness._serialized
+
+
 async def test_awareness_periodic_updates():
     ydoc = Doc()
     outdated_timeout = 200
@@ -452,3 +472,216 @@ def test_awareness_disconnection():
     # Should return False if it is not a disconnection message
     update = write_message(create_awareness_update(REMOTE_CLIENT_ID, "{}"))
     assert not is_awareness_disconnect_message(update)
+
+
+def test_awareness_encode_cached():
+    ydoc = Doc()
+    awareness = Awareness(ydoc)
+    # keep the remote formatting when re-broadcasting
+    remote_user_str = json.dumps(REMOTE_USER)
+    update = create_awareness_update(REMOTE_CLIENT_ID, remote_user_str)
+    awareness.apply_awareness_update(update, "custom_origin")
+    assert awareness.encode_awareness_update([REMOTE_CLIENT_ID]) == update
+    state = awareness.states[REMOTE_CLIENT_ID]
+    changes = []
+
+    def callback(topic, value):
+        changes.append((topic, value))
+
+    awareness.observe(callback)
+    # the same state is not deserialized again
+    awareness.apply_awareness_update(
+        create_awareness_update(REMOTE_CLIENT_ID, remote_user_str, 2), "custom_origin"
+    )
+    assert awareness.states[REMOTE_CLIENT_ID] is state
+    assert changes == [
+        (
+            "update",
+            ({"added": [], "updated": [REMOTE_CLIENT_ID], "removed": []}, "custom_origin"),
+        ),
+    ]
+
+    awareness.set_local_state({"foo": "bar"})
+    assert awareness.encode_awareness_update([ydoc.client_id]) == create_awareness_update(
+        ydoc.client_id, {"foo": "bar"}, 1
+    )
+
+
+def test_awareness_decode_invalid():
+    ydoc = Doc()
+    awareness = Awareness(ydoc)
+    with pytest.raises(ValueError):
+        awareness.apply_awareness_update(b"\x01\x02", "custom_origin")
+
+
+async def test_awareness_shared_scheduler():
+    outdated_timeout = 200
+    scheduler = AwarenessScheduler()
+    awarenesses = [
+        Awareness(Doc(), outdated_timeout=outdated_timeout, scheduler=scheduler) for _ in range(3)
+    ]
+    changes = []
+
+    def callback(topic, value):
+        changes.append((topic, value))
+
+    for idx, awareness in enumerate(awarenesses):
+        awareness.apply_awareness_update(
+            create_awareness_update(REMOTE_CLIENT_ID + idx, REMOTE_USER), "custom_origin"
+        )
+        awareness.observe(callback)
+
+    with pytest.raises(RuntimeError) as excinfo:
+        await awarenesses[0].start()
+    assert str(excinfo.value) == "Awareness uses a shared scheduler"
+
+    async with create_task_group() as tg:
+        await tg.start(scheduler.start)
+        # a client that keeps updating its state is not removed
+        for _ in range(3):
+            await sleep(outdated_timeout / 2 / 1000)
+            awarenesses[0].apply_awareness_update(
+                create_awareness_update(
+                    REMOTE_CLIENT_ID,
+                    REMOTE_USER,
+                    awarenesses[0].meta[REMOTE_CLIENT_ID]["clock"] + 1,
+                ),
+                "custom_origin",
+            )
+        await scheduler.stop()
+
+    removed = [
+        value[0]["removed"]
+        for topic, value in changes
+        if topic == "change" and value[1] == "timeout"
+    ]
+    assert removed == [[REMOTE_CLIENT_ID + 1], [REMOTE_CLIENT_ID + 2]]
+    assert REMOTE_CLIENT_ID in awarenesses[0].states
+    # a client has at most one expiry entry, however often it is updated
+    assert len(awarenesses[0]._expiry) == 1
+    # local states were renewed
+    for awareness in awarenesses:
+        assert awareness.meta[awareness.client_id]["clock"] > 0
+
+
+def test_awareness_local_state_no_copy():
+    ydoc = Doc()
+    awareness = Awareness(ydoc)
+    state = {"cursor": {"ranges": list(range(100))}}
+    awareness.set_local_state(state)
+    assert awareness.get_local_state() is state
+    changes = []
+
+    def callback(topic, value):
+        changes.append(topic)
+
+    awareness.observe(callback)
+
+    # same value: no change
+    awareness.set_local_state_field("cursor", {"ranges": list(range(100))})
+    assert changes == ["update"]
+    # the previous state is not mutated
+    awareness.set_local_state_field("name", "foo")
+    assert changes == ["update", "change", "update"]
+    assert state == {"cursor": {"ranges": list(range(100))}}
+    # an in-place mutation is considered a change
+    local_state = awareness.get_local_state()
+    local_state["name"] = "bar"
+    awareness.set_local_state(local_state)
+    assert changes == ["update", "change", "update", "change", "update"]
+    assert awareness.encode_awareness_update([ydoc.client_id]) == create_awareness_update(
+        ydoc.client_id, local_state, 4
+    )
+
+
+async def test_awareness_update_interval():
+    ydoc = Doc()
+    update_interval = 100
+    awareness = Awareness(ydoc, update_interval=update_interval)
+    changes = []
+
+    def callback(topic, value):
+        changes.append((topic, value))
+
+    awareness.observe(callback)
+    async with create_task_group() as tg:
+        await tg.start(awareness.start)
+        for idx in range(5):
+            awareness.set_local_state_field("cursor", idx)
+        awareness.apply_awareness_update(
+            create_awareness_update(REMOTE_CLIENT_ID, REMOTE_USER), "custom_origin"
+        )
+        # the initial local state was just emitted, further updates are pending
+        assert [topic for topic, _ in changes] == ["change"] * 6
+        await sleep(update_interval * 1.5 / 1000)
+        await awareness.stop()
+
+    assert [topic for topic, _ in changes] == ["change"] * 6 + ["update"] * 2
+    assert changes[-2:] == [
+        ("update", ({"added": [], "updated": [ydoc.client_id], "removed": []}, "local")),
+        ("update", ({"added": [REMOTE_CLIENT_ID], "updated": [], "removed": []}, "custom_origin")),
+    ]
+    # all the changed clients can be encoded in one message
+    client_ids = [
+        client_id
+        for _, (change, _) in changes[-2:]
+        for client_id in change["added"] + change["updated"] + change["removed"]
+    ]
+    awareness.encode_awareness_update(client_ids)
+
+    # pending updates can be flushed explicitly
+    changes.clear()
+    awareness.set_local_state(None)
+    assert changes == [
+        ("change", ({"added": [], "updated": [], "removed": [ydoc.client_id]}, "local")),
+    ]
+    awareness.flush()
+    assert changes[-1] == (
+        "update",
+        ({"added": [], "updated": [], "removed": [ydoc.client_id]}, "local"),
+    )
+
+
+async def test_awareness_registry():
+    outdated_timeout = 200
+    registry = AwarenessRegistry(outdated_timeout=outdated_timeout)
+    docs = {f"room{idx}": Doc() for idx in range(3)}
+    for room, doc in docs.items():
+        awareness = registry.add(room, doc)
+        assert registry[room] is awareness
+        awareness.apply_awareness_update(
+            create_awareness_update(REMOTE_CLIENT_ID, REMOTE_USER), "custom_origin"
+        )
+    assert len(registry) == 3
+    assert list(registry) == list(docs)
+    with pytest.raises(KeyError):
+        registry.add("room0", Doc())
+
+    # encoding a room only includes its own clients
+    doc = docs["room1"]
+    assert registry.encode_awareness_update("room1", [doc.client_id]) == create_awareness_update(
+        doc.client_id, {}, 0
+    )
+
+    removed = registry["room2"]
+    registry.remove("room2")
+    assert "room2" not in registry
+    async with create_task_group() as tg:
+        await tg.start(registry.start)
+        await sleep(outdated_timeout * 1.5 / 1000)
+        await registry.stop()
+
+    assert REMOTE_CLIENT_ID not in registry["room0"].states
+    assert REMOTE_CLIENT_ID not in registry["room1"].states
+    assert REMOTE_CLIENT_ID in removed.states
+
+
+def test_awareness_scheduler_compaction():
+    scheduler = AwarenessScheduler()
+    awarenesses = [Awareness(Doc(), scheduler=scheduler) for _ in range(100)]
+    for awareness in awarenesses:
+        scheduler._unschedule(awareness)
+    assert len(scheduler._heap) < 100
+    for awareness in awarenesses:
+        awareness._schedule()
+    assert all(awareness._deadline is not None for awareness in awarenesses)
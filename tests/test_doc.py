@@ -142,6 +142,46 @@ def test_transaction_event():
     assert str(remote_text1) == ""
 
 
+def test_transaction_event_changed():
+    doc = Doc()
+    doc["text"] = text = Text()
+    doc["map"] = map0 = Map({"nested": Array()})
+    doc["array"] = Array([0, Map()])
+    events = []
+    sub = doc.observe(partial(callback, events))  # noqa: F841
+
+    text += "Hello"
+    assert events[-1].changed == {"text": {0}}
+
+    with doc.transaction():
+        map0["nested"].append(1)
+        doc["array"][1]["key"] = "value"
+    assert events[-1].changed == {"map": {"nested"}, "array": {1}}
+
+    map0["key"] = "value"
+    assert events[-1].changed == {"map": {"key"}}
+    del map0["key"]
+    assert events[-1].changed == {"map": {"key"}}
+    doc["array"].append(2)
+    assert events[-1].changed == {"array": {2}}
+    del doc["array"][0]
+    assert events[-1].changed == {"array": {0}}
+    text.insert(2, "y", {"bold": True})
+    assert events[-1].changed == {"text": {2}}
+
+    # read long after the transactions have been committed and freed
+    del doc, text, map0
+    assert [event.changed for event in events] == [
+        {"text": {0}},
+        {"map": {"nested"}, "array": {1}},
+        {"map": {"key"}},
+        {"map": {"key"}},
+        {"array": {2}},
+        {"array": {0}},
+        {"text": {2}},
+    ]
+
+
 def test_client_id():
     doc0 = Doc()
     doc1 = Doc()
@@ -243,3 +283,35 @@ async def test_iterate_events():
     assert len(updates) == 2
     assert updates[0].endswith(b"Hello\x00")
     assert updates[1].endswith(b", World!\x00")
+
+
+def test_instrument():
+    doc = Doc()
+    text = doc.get("text", type=Text)
+    all_metrics = []
+    events = []
+
+    def callback(event):
+        events.append(event)
+
+    doc.instrument(all_metrics.append)
+    doc.observe(callback)
+
+    with doc.transaction(origin="test"):
+        with doc.transaction():
+            text += "Hello"
+    assert len(events) == 1
+    assert len(all_metrics) == 1
+    metrics = all_metrics[0]
+    assert metrics.origin == "test"
+    # two explicit transactions, and the ones opened by the text's += and insert()
+    assert metrics.nesting == 4
+    assert metrics.update_size == len(events[0].update)
+    assert metrics.integrated == 5
+    assert metrics.duration >= metrics.commit_duration >= metrics.observer_durations[callback]
+    assert "origin: test" in str(metrics)
+
+    doc.instrument(None)
+    text += ", World!"
+    assert len(events) == 2
+    assert len(all_metrics) == 1
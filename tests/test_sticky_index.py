@@ -0,0 +1,72 @@
+import pytest
+from pycrdt import Array, Assoc, Doc, StickyIndex, Text, XmlFragment, XmlText
+
+
+def test_text():
+    doc = Doc()
+    doc["text"] = text = Text("Hello, World!")
+    after = text.sticky_index(7)
+    before = text.sticky_index(7, Assoc.BEFORE)
+    assert after.assoc == Assoc.AFTER
+    assert before.assoc == Assoc.BEFORE
+    assert after.sequence is text
+
+    text.insert(0, "Oh, ")
+    assert after.get_index() == 11
+    assert before.get_index() == 11
+    text.insert(11, "dear ")
+    assert after.get_index() == 16
+    assert before.get_index() == 11
+    del text[:4]
+    with doc.transaction() as txn:
+        assert after.get_index(txn) == 12
+
+    with pytest.raises(IndexError):
+        text.sticky_index(100)
+
+    errors = []
+
+    def callback(event):
+        try:
+            text.sticky_index(0)
+        except RuntimeError as exception:
+            errors.append(exception)
+
+    text.observe(callback)
+    text.insert(0, "!")
+    assert len(errors) == 1
+
+
+def test_remote():
+    doc = Doc()
+    doc["text"] = text = Text("Hello, World!")
+    remote_doc = Doc()
+    remote_doc["text"] = remote_text = Text()
+    remote_doc.apply_update(doc.get_update())
+
+    data = text.sticky_index(7).encode()
+    assert isinstance(data, bytes)
+    remote_text.insert(0, "Oh, ")
+    doc.apply_update(remote_doc.get_update(doc.get_state()))
+    remote_cursor = StickyIndex.decode(data, remote_text)
+    assert remote_cursor.get_index() == 11
+    assert StickyIndex.decode(data, text).get_index() == 11
+
+    with pytest.raises(ValueError):
+        StickyIndex.decode(b"\xff", text)
+
+
+def test_array_and_xml_text():
+    doc = Doc()
+    doc["array"] = array = Array([0, 1, 2])
+    index = array.sticky_index(2)
+    array.insert(0, -1)
+    assert index.get_index() == 3
+    del array[0:2]
+    assert index.get_index() == 1
+
+    doc["fragment"] = fragment = XmlFragment([XmlText("Hello")])
+    xml_text = fragment.children[0]
+    index = xml_text.sticky_index(5)
+    xml_text.insert(0, ">> ")
+    assert index.get_index() == 8
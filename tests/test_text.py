@@ -149,6 +149,54 @@ def test_formatting():
     ]
 
 
+def test_diff_range():
+    doc = Doc()
+    doc["text"] = text = Text("")
+    text.insert(0, "hello ")
+    text.insert(len(text), "world", {"bold": True})
+    text.insert(len(text), "!", {"bold": True, "italic": True})
+    text.insert_embed(len(text), b"png blob", {"type": "image"})
+    text.insert(len(text), " bye")
+
+    assert text.diff(3, 8) == [("lo ", None), ("wo", {"bold": True})]
+    assert text.diff(6, 11) == [("world", {"bold": True})]
+    assert text.diff(11) == [
+        ("!", {"bold": True, "italic": True}),
+        (bytearray(b"png blob"), {"type": "image"}),
+        (" bye", None),
+    ]
+    assert text.diff(100) == []
+    assert list(text.iter_diff()) == text.diff()
+
+    chunks = text.iter_diff(0, 8)
+    assert next(chunks) == ("hello ", None)
+    text += "!"
+    assert list(chunks) == [("wo", {"bold": True})]
+
+    # embeds are read when the iterator is created
+    chunks = text.iter_diff(12, 13)
+    del text[12]
+    assert list(chunks) == [(bytearray(b"png blob"), {"type": "image"})]
+    text.insert_embed(12, b"png blob", {"type": "image"})
+
+    doc["text2"] = text2 = Text("")
+    text2.insert(0, "ab", {"bold": True})
+    text2.insert_embed(len(text2), 1, {"bold": True})
+    text2.insert(len(text2), "cd", {"bold": True})
+    first, _, last = text2.diff()
+    assert first[1] == last[1]
+    assert first[1] is not last[1]
+
+    with pytest.raises(ValueError):
+        text.diff(8, 3)
+    with pytest.raises(ValueError):
+        text.iter_diff(8, 3)
+    doc["text3"] = text3 = Text("ça")
+    with pytest.raises(ValueError):
+        text3.diff(1)
+    assert text3.diff(2) == [("a", None)]
+
+
 def test_observe():
     doc = Doc()
     doc["text"] = text = Text()
@@ -196,3 +244,94 @@ async def test_iterate_events():
     assert len(deltas) == 2
     assert deltas[0] == [{"insert": "Hello"}]
     assert deltas[1] == [{"retain": 5}, {"insert": ", World!"}]
+
+
+def test_apply_delta():
+    doc = Doc()
+    doc["text"] = text = Text("Hello, World!")
+    deltas = []
+    text.observe(lambda event: deltas.append(event.delta))
+
+    text.apply_delta(
+        [
+            {"retain": 7},
+            {"delete": 5},
+            {"insert": "Bob", "attributes": {"bold": True}},
+            {"insert": " and Alice"},
+            {"retain": 1, "attributes": {"italic": True}},
+        ]
+    )
+    assert str(text) == "Hello, Bob and Alice!"
+    assert text.diff() == [
+        ("Hello, ", None),
+        ("Bob", {"bold": True}),
+        (" and Alice", None),
+        ("!", {"italic": True}),
+    ]
+    assert len(deltas) == 1
+
+    remote_doc = Doc()
+    remote_doc["text"] = remote_text = Text("Hello, World!")
+    remote_text.apply_delta(deltas[0])
+    assert remote_text.diff() == text.diff()
+
+    with pytest.raises(ValueError):
+        text.apply_delta([{"retain": 100}])
+    with pytest.raises(ValueError):
+        text.apply_delta([{"foo": 1}])
+
+
+def test_set_from():
+    doc = Doc()
+    doc["text"] = text = Text("def foo(a,b):\n  return a+b\n")
+    remote_doc = Doc()
+    remote_doc["text"] = remote_text = Text()
+    remote_doc.apply_update(doc.get_update())
+    deltas = []
+    text.observe(lambda event: deltas.append(event.delta))
+
+    new_value = "def foo(a, b):\n    return a + b\n"
+    text.set_from(new_value)
+    assert str(text) == new_value
+    assert all("insert" not in op or len(op["insert"]) <= 2 for op in deltas[0])
+    remote_doc.apply_update(doc.get_update(remote_doc.get_state()))
+    assert str(remote_text) == new_value
+
+    text.set_from(new_value)
+    assert len(deltas) == 1
+
+    for value in ("", "ça va 👍", "ça ira 👍👍", "x"):
+        text.set_from(value)
+        assert str(text) == value
+
+    text.insert_embed(0, b"png blob")
+    with pytest.raises(ValueError):
+        text.set_from("foo")
+
+
+def test_offset_kind():
+    doc = Doc(offset_kind="utf16")
+    assert doc.offset_kind == "utf16"
+    assert Doc().offset_kind == "bytes"
+    with pytest.raises(ValueError):
+        Doc(offset_kind="foo")  # type: ignore[arg-type]
+
+    doc["text"] = text = Text("ça 👍 va")
+    assert len(text) == 8
+    text.insert(text.convert_index(4, "codepoints", "utf16"), "!")
+    assert str(text) == "ça 👍! va"
+
+    assert text.convert_indexes([9, 0, 4], "utf16", "codepoints") == [8, 0, 3]
+    assert text.convert_index(6, "utf16", "bytes") == 9
+    # in the middle of a character
+    assert text.convert_index(1, "bytes", "codepoints") == 0
+    assert text.convert_index(8, "codepoints", "bytes") == len(str(text).encode())
+    with pytest.raises(IndexError):
+        text.convert_index(9, "codepoints", "utf16")
+    with pytest.raises(ValueError):
+        text.convert_index(0, "codepoints", "foo")  # type: ignore[arg-type]
+
+    remote_doc = Doc()
+    remote_doc["text"] = remote_text = Text()
+    remote_doc.apply_update(doc.get_update())
+    assert len(remote_text) == len(str(text).encode())
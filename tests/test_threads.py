@@ -1,7 +1,7 @@
 import gc
 
 import pytest
-from anyio import CapacityLimiter, to_thread
+from anyio import CapacityLimiter, create_task_group, to_thread
 from pycrdt import Doc, Text
 
 pytestmark = pytest.mark.anyio
@@ -35,3 +35,48 @@ async def test_multi_threading():
 
     with pytest.raises(UnboundLocalError):
         doc
+
+
+async def test_concurrent_reads():
+    doc = Doc(allow_multithreading=True)
+    doc["text"] = text = Text("Hello, World!" * 1000)
+    state = doc.get_state()
+    update = doc.get_update()
+
+    def read(doc):
+        return doc.get_state(), doc.get_update()
+
+    async with create_task_group() as tg:
+        results = []
+
+        async def read_in_thread():
+            results.append(await to_thread.run_sync(read, doc))
+
+        for _ in range(4):
+            tg.start_soon(read_in_thread)
+
+    assert results == [(state, update)] * 4
+    assert str(text) == "Hello, World!" * 1000
+
+
+async def test_concurrent_reads_and_writes():
+    doc = Doc(allow_multithreading=True)
+    doc["text"] = text = Text()
+
+    def write():
+        for _ in range(200):
+            text.insert(0, "x")
+
+    def read():
+        return [doc.get_update() for _ in range(200)]
+
+    async with create_task_group() as tg:
+        tg.start_soon(to_thread.run_sync, write)
+        for _ in range(3):
+            tg.start_soon(to_thread.run_sync, read)
+
+    assert str(text) == "x" * 200
+    remote_doc = Doc()
+    remote_doc["text"] = remote_text = Text()
+    remote_doc.apply_update(doc.get_update())
+    assert str(remote_text) == "x" * 200
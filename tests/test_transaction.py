@@ -4,7 +4,7 @@ import time
 from functools import partial
 
 import pytest
-from anyio import create_task_group, fail_after, sleep, to_thread
+from anyio import create_task_group, fail_after, move_on_after, sleep, to_thread
 from pycrdt import Array, Doc, Map, Text, XmlFragment
 
 if sys.version_info < (3, 11):
@@ -278,6 +278,83 @@ async def test_new_async_transaction_concurrent_no_multithreading():
     assert map0.to_py() == {"key0": "val0", "key1": "val1"}
 
 
+async def test_new_async_transaction_many_waiters():
+    doc = Doc(allow_multithreading=True)
+    doc["map0"] = map0 = Map()
+
+    async def set_value(key: str, val: str) -> None:
+        async with doc.new_transaction():
+            await sleep(0)
+            map0[key] = val
+
+    # more waiters than the default thread limiter allows
+    async with create_task_group() as tg:
+        for i in range(100):
+            tg.start_soon(set_value, f"key{i}", f"val{i}")
+
+    assert map0.to_py() == {f"key{i}": f"val{i}" for i in range(100)}
+
+
+async def test_new_async_transaction_and_thread_transaction():
+    doc = Doc(allow_multithreading=True)
+    doc["map0"] = map0 = Map()
+    gc.collect()
+
+    async with create_task_group() as tg:
+        tg.start_soon(to_thread.run_sync, partial(create_new_transaction, map0, "key0", "val0"))
+        tg.start_soon(create_new_transaction_async, map0, "key1", "val1")
+        tg.start_soon(to_thread.run_sync, partial(create_new_transaction, map0, "key2", "val2"))
+        tg.start_soon(create_new_transaction_async, map0, "key3", "val3")
+
+    assert map0.to_py() == {f"key{i}": f"val{i}" for i in range(4)}
+
+
+async def test_new_async_transaction_cancelled():
+    doc = Doc(allow_multithreading=True)
+
+    async with doc.new_transaction():
+        with move_on_after(0.1):
+            async with doc.new_transaction():
+                pass  # pragma: no cover
+
+    async with doc.new_transaction():
+        pass
+
+
+async def test_shared_transaction_lock():
+    doc = Doc(allow_multithreading=True)
+    lock = doc._txn_lock
+    assert lock.acquire(shared=True)
+    assert lock.acquire(shared=True)
+    # a transaction waits for the readers
+    assert not lock.acquire(timeout=0.01)
+    with move_on_after(0.01):
+        async with doc.new_transaction():
+            pass  # pragma: no cover
+    lock.release(shared=True)
+    lock.release(shared=True)
+
+    async with doc.new_transaction():
+        # readers wait for the transaction
+        assert not lock.acquire(timeout=0.01, shared=True)
+        assert not await lock.acquire_async(timeout=0.01, shared=True)
+
+    def write():
+        with doc.new_transaction():
+            doc["text"] = Text("Hello")
+
+    assert lock.acquire(shared=True)
+    async with create_task_group() as tg:
+        tg.start_soon(to_thread.run_sync, write)
+        await sleep(0.1)
+        # readers do not overtake the waiting transaction
+        assert not lock.acquire(timeout=0.01, shared=True)
+        lock.release(shared=True)
+    assert doc.get_update()
+    with pytest.raises(RuntimeError):
+        lock.release(shared=True)
+
+
 def test_get_root_type_in_transaction():
     doc = Doc()
     with doc.transaction():
@@ -1,5 +1,15 @@
 import pytest
-from pycrdt import Array, Doc, Map, Text, UndoManager
+from pycrdt import (
+    Array,
+    Doc,
+    Map,
+    Text,
+    UndoManager,
+    UndoManagerGroup,
+    XmlElement,
+    XmlFragment,
+    XmlText,
+)
 
 
 def undo_redo(data, undo_manager, val0, val1, val3):
@@ -191,3 +201,196 @@ def test_timestamp():
     undo_manager.undo()
     assert str(text) == "a"
     assert timestamp_called == 4
+
+
+def test_default_clock():
+    doc = Doc()
+    doc["text"] = text = Text()
+    undo_manager = UndoManager(scopes=[text], capture_timeout_millis=60_000)
+    text += "a"
+    text += "b"
+    # changes within the capture timeout are grouped
+    assert len(undo_manager.undo_stack) == 1
+    undo_manager.undo()
+    assert str(text) == ""
+
+
+def test_max_stack_items():
+    doc = Doc()
+    doc["text"] = text = Text()
+    undo_manager = UndoManager(scopes=[text], capture_timeout_millis=0, max_stack_items=2)
+    with doc.transaction():
+        text += "a"
+    with doc.transaction():
+        text += "b"
+    assert len(undo_manager.undo_stack) == 2
+    with doc.transaction():
+        text += "c"
+    # the oldest item was dropped, the latest edits can still be undone and redone
+    assert len(undo_manager.undo_stack) == 2
+    assert undo_manager.undo()
+    assert str(text) == "ab"
+    assert undo_manager.undo()
+    assert str(text) == "a"
+    assert not undo_manager.can_undo()
+    assert undo_manager.redo()
+    assert undo_manager.redo()
+    assert str(text) == "abc"
+    assert not undo_manager.can_redo()
+    text += "d"
+    assert len(undo_manager.undo_stack) == 2
+    undo_manager.undo()
+    assert str(text) == "abc"
+    undo_manager.undo()
+    assert str(text) == "ab"
+
+
+def test_max_stack_bytes():
+    doc = Doc()
+    doc["text"] = text = Text()
+    undo_manager = UndoManager(scopes=[text], capture_timeout_millis=0)
+    assert undo_manager.memory_usage == 0
+    text += "a"
+    memory_usage = undo_manager.memory_usage
+    assert memory_usage > 0
+    del undo_manager
+
+    undo_manager = UndoManager(
+        scopes=[text], capture_timeout_millis=0, max_stack_bytes=memory_usage * 2
+    )
+    for char in "bcd":
+        text += char
+        assert undo_manager.memory_usage <= memory_usage * 2
+    assert undo_manager.memory_usage == sum(item.size for item in undo_manager.undo_stack)
+    undo_manager.undo()
+    assert str(text) == "abc"
+
+
+def test_max_stack_bytes_large_item():
+    doc = Doc()
+    doc["text"] = text = Text("ab" * 100)
+    undo_manager = UndoManager(scopes=[text], capture_timeout_millis=0)
+    text += "c"
+    limit = undo_manager.memory_usage * 4
+    del undo_manager
+
+    undo_manager = UndoManager(scopes=[text], capture_timeout_millis=0, max_stack_bytes=limit)
+    text += "d"
+    with doc.transaction():
+        # deleting every other character makes an item with many deleted ranges
+        for index in range(199, 0, -2):
+            del text[index]
+    # the item over the limit is kept until the next change
+    assert undo_manager.memory_usage > limit
+    doc["other"] = Text("untracked")
+    assert len(undo_manager.undo_stack) == 2
+    undo_manager.undo()
+    assert str(text) == "ab" * 100 + "cd"
+    undo_manager.redo()
+    assert str(text) == "a" * 100 + "cd"
+    text += "e"
+    assert len(undo_manager.undo_stack) == 1
+    assert undo_manager.memory_usage <= limit
+    undo_manager.undo()
+    assert str(text) == "a" * 100 + "cd"
+    assert not undo_manager.can_undo()
+
+
+def test_xml_scope():
+    doc = Doc()
+    doc["fragment"] = fragment = XmlFragment()
+    undo_manager = UndoManager(scopes=[fragment], capture_timeout_millis=0)
+    fragment.children.append(XmlElement("p", {"class": "foo"}, [XmlText("Hello")]))
+    element = fragment.children[0]
+    text = element.children[0]
+    assert str(fragment) == '<p class="foo">Hello</p>'
+    text += ", World!"
+    assert str(fragment) == '<p class="foo">Hello, World!</p>'
+    undo_manager.undo()
+    assert str(fragment) == '<p class="foo">Hello</p>'
+    undo_manager.undo()
+    assert str(fragment) == ""
+
+
+def test_all_roots():
+    doc = Doc()
+    doc["text0"] = text0 = Text()
+    undo_manager = UndoManager(doc=doc, capture_timeout_millis=0, all_roots=True)
+    text0 += "Hello"
+    doc["text1"] = text1 = Text()
+    text1 += "World"
+    remote_doc = Doc()
+    remote_doc["array"] = Array([1, 2])
+    doc.apply_update(remote_doc.get_update())
+    array = doc.get("array", type=Array)
+    array.append(3)
+    assert len(undo_manager.undo_stack) == 3
+    undo_manager.undo()
+    assert array.to_py() == [1, 2]
+    undo_manager.undo()
+    assert str(text1) == ""
+    undo_manager.undo()
+    assert str(text0) == ""
+
+
+def test_undo_manager_group():
+    doc = Doc()
+    doc["text"] = text = Text()
+    undo_managers = UndoManagerGroup(
+        doc=doc, capture_timeout_millis=0, all_roots=True, exclude_origins=["remote"]
+    )
+    assert len(undo_managers) == 0
+    # origins that do not change the document, or that are excluded, get no undo manager
+    with doc.transaction(origin="reader"):
+        str(text)
+    with doc.transaction(origin="remote"):
+        text += "remote "
+    assert len(undo_managers) == 0
+    del text[:]
+    with doc.transaction(origin="alice"):
+        text += "Hello"
+    with doc.transaction(origin="bob"):
+        text += ", World"
+    with doc.transaction(origin="alice"):
+        text += "!"
+    assert set(undo_managers) == {"alice", "bob"}
+    assert len(undo_managers["alice"].undo_stack) == 2
+    assert len(undo_managers["bob"].undo_stack) == 1
+    assert not undo_managers.can_undo("carol")
+    assert not undo_managers.undo("carol")
+
+    assert undo_managers.undo("bob")
+    assert str(text) == "Hello!"
+    assert not undo_managers.can_undo("bob")
+    assert undo_managers.undo("alice")
+    assert str(text) == "Hello"
+    assert undo_managers.redo("bob")
+    assert str(text) == "Hello, World"
+    assert undo_managers.memory_usage > 0
+
+    # roots created later are tracked
+    with doc.transaction(origin="carol"):
+        doc["array"] = array = Array([0])
+    with doc.transaction(origin="carol"):
+        array.append(1)
+    assert undo_managers.undo("carol")
+    assert array.to_py() == [0]
+
+    undo_managers.remove("bob")
+    assert "bob" not in undo_managers
+
+
+def test_stack_item():
+    doc = Doc()
+    doc["text"] = text = Text()
+    undo_manager = UndoManager(scopes=[text], capture_timeout_millis=0)
+    text += "Hello"
+    del text[:2]
+    insert_item, delete_item = undo_manager.undo_stack
+    assert insert_item.insertions != b"\x00"
+    assert insert_item.deletions == b"\x00"
+    assert delete_item.insertions == b"\x00"
+    assert delete_item.deletions != b"\x00"
+    for item in (insert_item, delete_item):
+        assert item.size == len(item.insertions) + len(item.deletions)
+    assert undo_manager.memory_usage == insert_item.size + delete_item.size
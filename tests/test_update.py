@@ -1,4 +1,16 @@
-from pycrdt import Doc, Map, Text, get_state, get_update, merge_updates
+import pytest
+from anyio import create_task_group, sleep
+from pycrdt import (
+    Doc,
+    Map,
+    Text,
+    aget_state,
+    aget_update,
+    amerge_updates,
+    get_state,
+    get_update,
+    merge_updates,
+)
 
 
 def test_update():
@@ -53,3 +65,53 @@ def test_update_transaction():
         doc1.apply_update(update1)
 
     assert str(doc1.get("test", type=Text)) == "Hello World!"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("process", [False, True])
+async def test_async_update(process):
+    doc0 = Doc()
+    doc0["data"] = Map({"key0": "val0"})
+    doc1 = Doc()
+    doc1["data"] = Map({"key1": "val1"})
+
+    update0 = await doc0.aget_update()
+    assert update0 == doc0.get_update()
+    update1 = await doc1.aget_update(doc0.get_state())
+    assert update1 == doc1.get_update(doc0.get_state())
+
+    state0 = await aget_state(update0, process=process)
+    assert state0 == get_state(update0)
+    update10 = await aget_update(update1, state0, process=process)
+    assert update10 == get_update(update1, state0)
+    merged = await amerge_updates(update0, update10, process=process)
+    assert merged == merge_updates(update0, update10)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("allow_multithreading", [False, True])
+async def test_async_update_concurrent_writer(allow_multithreading):
+    doc = Doc(allow_multithreading=allow_multithreading)
+    doc["text"] = text = Text("Hello, World!" * 1000)
+    updates = []
+
+    async def write():
+        for _ in range(20):
+            async with doc.new_transaction():
+                text.insert(0, "!")
+            await sleep(0)
+
+    async def read():
+        for _ in range(5):
+            updates.append(await doc.aget_update())
+
+    async with create_task_group() as tg:
+        tg.start_soon(write)
+        for _ in range(3):
+            tg.start_soon(read)
+
+    assert len(updates) == 15
+    assert str(text) == "!" * 20 + "Hello, World!" * 1000
+    remote_doc = Doc()
+    remote_doc.apply_update(updates[-1])
+    assert len(str(remote_doc.get("text", type=Text))) >= 13000
@@ -1,5 +1,7 @@
+import json
+
 import pytest
-from pycrdt import Array, Doc, Map, XmlElement, XmlFragment, XmlText
+from pycrdt import Array, Doc, Map, Text, XmlElement, XmlFragment, XmlText
 
 
 def test_plain_text():
@@ -309,3 +311,153 @@ def test_xml_in_map():
     with pytest.raises(TypeError):
         map["testel"] = XmlElement("a")
     assert len(map) == 1
+
+
+def test_walk():
+    doc = Doc()
+    doc["test"] = frag = XmlFragment(
+        [
+            XmlElement("p", None, [XmlText("Hello"), XmlElement("b", None, [XmlText("World")])]),
+            XmlText("!"),
+        ]
+    )
+    assert [str(node) for node in frag.children] == [
+        "<p>Hello<b>World</b></p>",
+        "!",
+    ]
+    nodes = list(frag.walk())
+    assert [node.tag if isinstance(node, XmlElement) else str(node) for node in nodes] == [
+        "p",
+        "Hello",
+        "b",
+        "World",
+        "!",
+    ]
+    paragraph = frag.children[0]
+    assert [str(node) for node in paragraph.walk()] == ["Hello", "<b>World</b>", "World"]
+
+
+def test_to_dict():
+    doc = Doc()
+    doc["test"] = frag = XmlFragment(
+        [
+            XmlElement("p", {"class": "foo"}, [XmlText("Hello"), XmlElement("br")]),
+        ]
+    )
+    text = frag.children[0].children[0]
+    text.format(0, 2, {"bold": True})
+    expected_paragraph = {
+        "tag": "p",
+        "attributes": {"class": "foo"},
+        "children": [
+            {
+                "delta": [
+                    {"insert": "He", "attributes": {"bold": True}},
+                    {"insert": "llo"},
+                ]
+            },
+            {"tag": "br", "attributes": {}, "children": []},
+        ],
+    }
+    assert frag.to_dict() == {"children": [expected_paragraph]}
+    assert list(frag.iter_dicts()) == [expected_paragraph]
+
+
+def test_insert_tree():
+    doc = Doc()
+    doc["test"] = frag = XmlFragment()
+    tree = {
+        "tag": "p",
+        "attributes": {"class": "foo"},
+        "children": [
+            {"delta": [{"insert": "He", "attributes": {"bold": True}}, {"insert": "llo"}]},
+            {"tag": "br", "attributes": {}, "children": []},
+        ],
+    }
+    (paragraph,) = frag.insert_tree(0, tree)
+    assert isinstance(paragraph, XmlElement)
+    assert frag.to_dict() == {"children": [tree]}
+    frag.insert_tree(0, {"children": [{"delta": [{"insert": "first"}]}]})
+    assert frag.children[1] == paragraph
+    text, br = frag.insert_tree(2, "world <b>bold</b>")
+    assert str(text) == "world "
+    assert str(br) == "<b>bold</b>"
+    assert str(frag) == 'first<p class="foo"><bold>He</bold>llo<br></br></p>world <b>bold</b>'
+
+    with pytest.raises(IndexError):
+        frag.insert_tree(10, "<p/>")
+    with pytest.raises(ValueError):
+        frag.insert_tree(0, [{"foo": "bar"}])
+    with pytest.raises(TypeError):
+        frag.insert_tree(0, {"delta": [{"insert": object()}]})
+
+    element = XmlElement("div", {"id": "1"}, ["a", XmlText("b"), XmlElement("span", None, ["c"])])
+    frag.children.append(element)
+    span = element.children[2]
+    assert element.children[1].is_integrated
+    assert str(span) == "<span>c</span>"
+    assert element.attributes["id"] == "1"
+
+
+def test_typed_attributes():
+    doc = Doc()
+    doc["test"] = frag = XmlFragment()
+    element = frag.children.append(
+        XmlElement("img", {"width": 100, "hidden": False, "style": {"color": "red"}})
+    )
+    assert element.attributes["width"] == 100
+    assert element.attributes["hidden"] is False
+    assert element.attributes["style"] == {"color": "red"}
+    element.attributes["alt"] = Text("an image")
+    alt = element.attributes["alt"]
+    assert isinstance(alt, Text)
+    assert str(alt) == "an image"
+    assert isinstance(element.attributes.get("alt"), Text)
+    assert isinstance(element.attributes.get_many(["alt"])[0], Text)
+    assert isinstance(dict(element.attributes.items())["alt"], Text)
+    assert dict(element.attributes)["width"] == 100
+    element.attributes["title"] = None
+    assert element.attributes["title"] is None
+    with pytest.raises(KeyError):
+        element.attributes["missing"]
+    assert frag.to_dict()["children"][0]["attributes"]["hidden"] is False
+
+    (paragraph,) = frag.insert_tree(0, {"tag": "p", "attributes": {"level": 2}})
+    assert paragraph.attributes["level"] == 2
+
+    remote_doc = Doc()
+    remote_doc["test"] = remote_frag = XmlFragment()
+    remote_doc.apply_update(doc.get_update())
+    remote_element = remote_frag.children[1]
+    assert remote_element.attributes["width"] == 100
+    assert str(remote_element.attributes["alt"]) == "an image"
+
+
+def test_to_dict_json():
+    doc = Doc()
+    doc["test"] = frag = XmlFragment()
+    element = frag.children.append(XmlElement("img"))
+    element.attributes["alt"] = Text("an image")
+    element.attributes["tags"] = Array(["a", "b"])
+    text = frag.children.append(XmlText("caption"))
+    text.insert_embed(7, {"src": "icon.png"})
+    exported = frag.to_dict()
+    assert exported["children"][0]["attributes"] == {"alt": "an image", "tags": ["a", "b"]}
+    assert exported["children"][1]["delta"] == [
+        {"insert": "caption"},
+        {"insert": {"src": "icon.png"}},
+    ]
+    assert json.loads(json.dumps(exported)) == exported
+
+
+def test_attribute_keys():
+    doc = Doc()
+    doc["test"] = frag = XmlFragment()
+    element = frag.children.append(XmlElement("a", {"href": "/", "title": "home", "rel": None}))
+    attributes = element.attributes
+    assert len(attributes) == 3
+    assert sorted(attributes.keys()) == ["href", "rel", "title"]
+    assert dict(attributes.items()) == {"href": "/", "title": "home", "rel": None}
+    assert "rel" in attributes
+    assert "target" not in attributes
+    assert attributes.get_many(["title", "target", "href"]) == ["home", None, "/"]